@@ -1,53 +1,182 @@
 # main.py - FastAPI Multi-Repo Ideation Backend
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 import os
 import asyncio
+import requests
 import logging
+import random
+import re
+import uuid
 from contextlib import asynccontextmanager
 
+# Settings here and in the project modules are read from the environment at
+# import time, so .env has to be loaded before any of them is imported
+from utils.helpers import load_env
+load_env()
+
 # Import the existing modules (assuming they're in your project)
 from extractor.clone_repo import clone_repo
 from extractor.parse_repo import parse_repo
-from extractor.summarizer import extract_features_and_techstack, suggest_new_features_from_features, suggest_new_tech_stack_from_tech_stack # <--- UPDATED IMPORT
-from database.db import init_db, insert_project, insert_features, insert_tech_stack, insert_ideated_features, insert_ideated_tech_stack # <--- UPDATED IMPORT for DB
+from extractor.fetch_archive import FETCH_BACKEND, FETCH_BACKENDS, fetch_archive
+from extractor.dedup import dedup_repo_data
+from extractor.summarizer import SUMMARIZER_MODE, SUMMARIZER_MODES, extract_features_and_techstack_with_stats, suggest_new_features_from_features, suggest_new_tech_stack_from_tech_stack # <--- UPDATED IMPORT
+from database.db import init_db, insert_idea_request, insert_project, insert_features, insert_tech_stack, insert_ideated_features, insert_ideated_tech_stack # <--- UPDATED IMPORT for DB
+from database.db import FEATURE, TECH, get_top_items, get_cooccurring_items
+from database.db import (
+    IDEATION_FIELDS, PROJECT_FIELDS, get_ideation, get_project, list_ideations, list_project_items, list_projects,
+)
+from database.corpus_index import get_index
+from database.export import EXPORT_DIR, EXPORT_TABLES, export_to_parquet
 from utils.helpers import parse_llm_summary
+from utils.timing import StageTimer
+from utils.deadline import Deadline, DeadlineExceeded
+from utils.profiler import SamplingProfiler, list_profiles, load_profile, profiled, save_profile
+from warmup import WARMUP_ENABLED, WarmupScheduler, activity, prune_request_log
 from github_search import search_similar_repositories
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Minimum similarity for a stored repository to stand in for a GitHub result
+LOCAL_INDEX_MIN_SCORE = float(os.getenv("LOCAL_INDEX_MIN_SCORE", "0.2"))
+# How long an analysis of a repository URL is reused instead of cloning it again
+ANALYSIS_TTL_SECONDS = float(os.getenv("ANALYSIS_TTL_SECONDS", str(7 * 24 * 3600)))
+# Default time limit for one /ideate request, split into per-stage budgets:
+# search gets a share of it, analysis a share of what is left, ideation the rest
+IDEATE_DEADLINE_SECONDS = float(os.getenv("IDEATE_DEADLINE_SECONDS", "120"))
+SEARCH_BUDGET_FRACTION = 0.15
+ANALYSIS_BUDGET_FRACTION = 0.75
+# Fraction of /ideate requests profiled without being asked to (0 disables sampling)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+# Guards the /admin endpoints and explicit profiling requests; /admin is disabled when unset
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+_REQUEST_ID_RX = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
 # Database initialization
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Initialize database on startup
+    # Initialize database on startup; the LLM client is created on first use
+    if FETCH_BACKEND not in FETCH_BACKENDS:
+        raise ValueError(f"Invalid FETCH_BACKEND '{FETCH_BACKEND}'. Use one of: {', '.join(FETCH_BACKENDS)}")
+    if SUMMARIZER_MODE not in SUMMARIZER_MODES:
+        raise ValueError(f"Invalid SUMMARIZER_MODE '{SUMMARIZER_MODE}'. Use one of: {', '.join(SUMMARIZER_MODES)}")
     init_db()
     logger.info("Database initialized")
+    # The request log is only read over a sliding window, also when warm-up is off
+    prune_request_log()
+    global warmup_scheduler
+    if WARMUP_ENABLED:
+        warmup_scheduler = WarmupScheduler(
+            lambda repo_info, deadline, refresh: _process_repository(repo_info, StageTimer(), deadline, refresh),
+            ANALYSIS_TTL_SECONDS,
+        ).start()
+        logger.info("Warm-up scheduler started")
     yield
     # Cleanup on shutdown if needed
+    if warmup_scheduler:
+        warmup_scheduler.stop()
     logger.info("Application shutting down")
 
+# Background warm-up of popular ideas (warmup.py), started in lifespan when WARMUP_ENABLED=1
+warmup_scheduler: Optional[WarmupScheduler] = None
+
+# orjson (optional, requirements-optional.txt) serializes large pages several times faster than the standard library
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:
+    DefaultResponse = JSONResponse
+
 # FastAPI app
 app = FastAPI(
     title="Multi-Repo Feature Ideation API",
     description="Generate feature ideas for your project by analyzing similar GitHub repositories",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=DefaultResponse,
 )
 
+# Compress responses larger than this; brotli when the optional brotli-asgi is installed (it falls back to gzip)
+COMPRESS_MIN_BYTES = 1000
+try:
+    from brotli_asgi import BrotliMiddleware
+    app.add_middleware(BrotliMiddleware, minimum_size=COMPRESS_MIN_BYTES)
+except ImportError:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESS_MIN_BYTES)
+
+def _is_admin(token: Optional[str]) -> bool:
+    return bool(ADMIN_TOKEN) and token == ADMIN_TOKEN
+
+def _should_profile(request: Request) -> bool:
+    # Profiles are only readable through /admin, so without a token nothing is profiled
+    if not ADMIN_TOKEN or request.url.path.startswith("/admin"):
+        return False
+    asked = request.headers.get("x-profile") == "1" or request.query_params.get("profile") == "1"
+    if asked:
+        # Profiling costs CPU, so only admins may ask for it
+        return _is_admin(request.headers.get("x-admin-token"))
+    return request.url.path == "/ideate" and PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+# Requests that do not make the API busy (health checks, monitoring)
+_BACKGROUND_PATHS = ("/", "/status")
+
+@app.middleware("http")
+async def track_activity(request: Request, call_next):
+    """Record requests in flight, so the warm-up scheduler only runs while the API is idle."""
+    if request.url.path in _BACKGROUND_PATHS or request.url.path.startswith("/admin"):
+        return await call_next(request)
+    activity.begin()
+    try:
+        return await call_next(request)
+    finally:
+        activity.end()
+
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    """
+    Profile the request (its own tasks and worker threads, sampled) when an
+    admin asks with `X-Profile: 1` or `?profile=1`, or for a
+    PROFILE_SAMPLE_RATE share of /ideate calls. Does nothing unless
+    ADMIN_TOKEN is set. The profile id is returned in `X-Profile-Id`; the
+    folded stacks are served by GET /admin/profiles/{id}.
+    """
+    if not _should_profile(request):
+        return await call_next(request)
+    request_id = request.headers.get("x-request-id", "")
+    profile_id = request_id if _REQUEST_ID_RX.match(request_id) else uuid.uuid4().hex
+    profiler = SamplingProfiler().start()
+    started = asyncio.get_running_loop().time()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        profiler.stop()
+        duration_ms = round((asyncio.get_running_loop().time() - started) * 1000, 1)
+        meta = {"method": request.method, "path": request.url.path, "status": status, "duration_ms": duration_ms}
+        await asyncio.to_thread(save_profile, profile_id, profiler, meta)
+    response.headers["X-Profile-Id"] = profile_id
+    return response
+
 # Pydantic models
 class IdeationRequest(BaseModel):
     project_idea: str = Field(..., description="Description of your project idea", min_length=3, max_length=500)
     max_repos: int = Field(default=3, ge=1, le=10, description="Number of repositories to analyze (1-10)")
+    use_local_index: bool = Field(default=True, description="Reuse already analysed repositories that match the idea before searching GitHub")
+    deadline_seconds: Optional[float] = Field(default=None, gt=0, le=600, description=f"Time limit for the whole request (default {IDEATE_DEADLINE_SECONDS:g}s); repositories not analysed in time are skipped")
 
 class RepositoryInfo(BaseModel):
     name: str
     url: str
     features: List[str]
     tech_stack: List[str]
+    source: str = "github"  # "github" (analysed now) or "local" (from the corpus index)
 
 class IdeationResponse(BaseModel):
     project_idea: str
@@ -57,29 +186,124 @@ class IdeationResponse(BaseModel):
     suggested_features: str
     suggested_tech_stack: str # <--- NEW FIELD
     total_repos_processed: int
+    cut_off_repos: List[str] = Field(default_factory=list, description="URLs of repositories left out because the deadline was reached")
+    search_cut_off: bool = Field(default=False, description="The GitHub search failed or ran out of time; only local index matches were used")
+
+class ItemCount(BaseModel):
+    item: str
+    count: int
+
+class AnalyticsResponse(BaseModel):
+    kind: str
+    keyword: Optional[str] = None
+    item: Optional[str] = None
+    results: List[ItemCount]
+
+class ExportRequest(BaseModel):
+    tables: Optional[List[str]] = Field(default=None, description=f"Tables to export (default: all of {', '.join(EXPORT_TABLES)})")
+    full: bool = Field(default=False, description="Ignore the watermarks and export every row again")
+
+class ExportedTable(BaseModel):
+    rows: int
+    files: List[str]
+    watermark: int
+
+class ExportResponse(BaseModel):
+    export_dir: str
+    tables: Dict[str, ExportedTable]
+
+class HistoryPage(BaseModel):
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[int] = Field(default=None, description="Pass as `cursor` to get the next page; null on the last page")
 
 class ErrorResponse(BaseModel):
     error: str
     details: Optional[str] = None
 
+def _store_ideation(project_idea: str, features: List[str], tech_stack: List[str],
+                     suggested_features: str, suggested_tech_stack: str) -> int:
+    project_id = insert_project(f"[MultiRepo:{project_idea}]", "virtual")
+    insert_features(project_id, features)
+    insert_tech_stack(project_id, tech_stack)
+    insert_ideated_features(project_id, suggested_features)
+    insert_ideated_tech_stack(project_id, suggested_tech_stack) # <--- NEW DB INSERTION
+    return project_id
+
 # Helper function to process a single repository
-async def process_repository(repo_info: dict) -> Optional[RepositoryInfo]:
-    """Process a single repository and extract features/tech stack"""
+async def process_repository(repo_info: dict, timer: Optional[StageTimer] = None,
+                             deadline: Optional[Deadline] = None) -> Optional[RepositoryInfo]:
+    """Process a single repository and extract features/tech stack (in a worker thread)"""
+    return await asyncio.to_thread(profiled(_process_repository), repo_info, timer or StageTimer(), deadline or Deadline())
+
+def _process_repository(repo_info: dict, timer: StageTimer, deadline: Deadline,
+                        refresh: bool = False) -> Optional[RepositoryInfo]:
+    """
+    Blocking part of `process_repository`. Every stage is bounded by `deadline`;
+    raises DeadlineExceeded if it runs out before the repository is analysed.
+    `refresh` ignores the stored analysis and the existing clone.
+    """
     try:
         logger.info(f"Processing repository: {repo_info['name']}")
+
+        # Reuse a recent analysis, possibly made by another worker
+        cached = None if refresh else get_index().get(repo_info["url"], max_age_seconds=ANALYSIS_TTL_SECONDS)
+        if cached:
+            logger.info(f"Using stored analysis for: {repo_info['name']}")
+            return RepositoryInfo(
+                name=repo_info["name"],
+                url=repo_info["url"],
+                features=cached["features"],
+                tech_stack=cached["tech_stack"],
+            )
         
         # Clone repository
-        local_path = clone_repo(repo_info["url"])
-        if not local_path:
-            logger.warning(f"Failed to clone repository: {repo_info['name']}")
-            return None
-        
-        # Parse repository
-        repo_data = parse_repo(local_path)
+        if FETCH_BACKEND == "archive":
+            # Stream the repository archive straight into the parser, no working tree
+            deadline.check("fetch")
+            with timer.stage("fetch"):
+                repo_data = fetch_archive(repo_info["url"], clone_type="readme", deadline=deadline)
+            deadline.check("dedup")
+            if not repo_data:
+                logger.warning(f"Failed to fetch repository archive: {repo_info['name']}")
+                return None
+        else:
+            deadline.check("clone")
+            with timer.stage("clone"):
+                local_path = clone_repo(repo_info["url"], deadline=deadline, refresh=refresh)
+            deadline.check("parse")
+            if not local_path:
+                logger.warning(f"Failed to clone repository: {repo_info['name']}")
+                return None
+
+            # Parse repository
+            with timer.stage("parse"):
+                repo_data = parse_repo(local_path)
+        with timer.stage("dedup"):
+            repo_data, dedup_stats = dedup_repo_data(repo_data)
+        logger.info(
+            f"Dedup for {repo_info['name']}: {dedup_stats['bytes_saved']} bytes "
+            f"(~{dedup_stats['tokens_saved']} tokens) saved"
+        )
         
         # Extract features and tech stack using LLM
-        summary = extract_features_and_techstack(repo_data)
+        with timer.stage("extract"):
+            summary, extract_stats = extract_features_and_techstack_with_stats(repo_data, deadline=deadline)
+        logger.info(
+            f"Extraction for {repo_info['name']}: {extract_stats['chunks_processed']}/{extract_stats['chunks_total']} chunks, "
+            f"{extract_stats['chunks_skipped']} skipped (~{extract_stats['latency_saved_s']}s saved)"
+        )
         features, tech_stack = parse_llm_summary(summary)
+        if not features and not tech_stack:
+            # Do not store (and later reuse) an empty analysis
+            logger.warning(f"No features or tech stack extracted from {repo_info['name']}")
+            return None
+
+        # Make the result available to later requests without cloning again
+        try:
+            with timer.stage("index"):
+                get_index().add(repo_info["url"], repo_info["name"], features, tech_stack, repo_data["readme"])
+        except Exception as e:
+            logger.warning(f"Failed to index repository {repo_info['name']}: {str(e)}")
         
         return RepositoryInfo(
             name=repo_info["name"],
@@ -88,6 +312,8 @@ async def process_repository(repo_info: dict) -> Optional[RepositoryInfo]:
             tech_stack=tech_stack
         )
         
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logger.error(f"Error processing repository {repo_info['name']}: {str(e)}")
         return None
@@ -99,7 +325,7 @@ async def root():
     return {"message": "Multi-Repo Feature Ideation API is running!", "status": "healthy"}
 
 @app.post("/ideate", response_model=IdeationResponse, summary="Generate Feature Ideas")
-async def generate_feature_ideas(request: IdeationRequest):
+async def generate_feature_ideas(request: IdeationRequest, response: Response):
     """
     Generate feature ideas for a project by analyzing similar GitHub repositories.
     
@@ -109,32 +335,106 @@ async def generate_feature_ideas(request: IdeationRequest):
     3. Extracts features and tech stack from each repository
     4. Aggregates all features and generates new feature suggestions
     5. Stores the results in the database
+
+    Repositories are analysed concurrently within a per-stage share of
+    `deadline_seconds`. Stalled clones are killed and pending LLM calls are
+    cancelled when it runs out; the response is built from the repositories
+    that finished, and the rest are listed in `cut_off_repos`. If the GitHub
+    search fails or runs out of time, the local index matches are used alone
+    and `search_cut_off` is set (504 if there are none).
+
+    Per-stage timings are returned in the `Server-Timing` response header.
     """
+    timer = StageTimer()
+    deadline = Deadline(request.deadline_seconds or IDEATE_DEADLINE_SECONDS)
     try:
         logger.info(f"Starting ideation for: {request.project_idea}")
+        try:
+            # Request log the warm-up scheduler learns popular ideas from
+            await asyncio.to_thread(profiled(insert_idea_request), request.project_idea)
+        except Exception as e:
+            logger.warning(f"Failed to log ideation request: {str(e)}")
         
-        # Search for similar repositories
-        logger.info("Searching GitHub for similar repositories...")
-        repo_candidates = search_similar_repositories(request.project_idea, request.max_repos)
-        
-        if not repo_candidates:
-            raise HTTPException(status_code=404, detail="No repositories found for the given project idea")
-        
-        logger.info(f"Found {len(repo_candidates)} repositories")
-        
-        # Process repositories (you might want to make this truly async in production)
         processed_repos = []
         aggregated_features = []
         aggregated_tech_stack = []
+
+        # Answer from already analysed repositories first
+        local_matches = []
+        if request.use_local_index:
+            with timer.stage("local_index"):
+                local_matches = await asyncio.to_thread(
+                    profiled(get_index().search), request.project_idea, k=request.max_repos, min_score=LOCAL_INDEX_MIN_SCORE,
+                )
+            logger.info(f"Found {len(local_matches)} matching repositories in the local index")
+        for match in local_matches:
+            processed_repos.append(RepositoryInfo(
+                name=match["name"],
+                url=match["url"],
+                features=match["features"],
+                tech_stack=match["tech_stack"],
+                source="local",
+            ))
+            aggregated_features.extend(match["features"])
+            aggregated_tech_stack.extend(match["tech_stack"])
+
+        # Search GitHub only for the remaining slots
+        repo_candidates = []
+        search_error = None
+        remaining = request.max_repos - len(local_matches)
+        if remaining > 0:
+            logger.info("Searching GitHub for similar repositories...")
+            local_urls = {m["url"] for m in local_matches}
+            # Over-fetch by the number of local hits, which GitHub may return again
+            try:
+                with timer.stage("search"):
+                    found = await asyncio.to_thread(
+                        profiled(search_similar_repositories), request.project_idea, remaining + len(local_matches),
+                        deadline=deadline.budget(SEARCH_BUDGET_FRACTION),
+                    )
+                repo_candidates = [r for r in found if r["url"] not in local_urls][:remaining]
+            except (DeadlineExceeded, requests.RequestException) as e:
+                # Answer from the local matches alone rather than failing the request
+                search_error = e
+                logger.warning(f"GitHub search cut off: {str(e)}")
+
+        if not repo_candidates and not local_matches:
+            if isinstance(search_error, (DeadlineExceeded, requests.Timeout)):
+                raise HTTPException(status_code=504, detail=f"GitHub search did not finish within the deadline: {str(search_error)}")
+            if search_error:
+                raise HTTPException(status_code=502, detail=f"GitHub search failed: {str(search_error)}")
+            raise HTTPException(status_code=404, detail="No repositories found for the given project idea")
         
-        for repo_info in repo_candidates:
-            processed_repo = await process_repository(repo_info)
-            if processed_repo:
-                processed_repos.append(processed_repo)
-                aggregated_features.extend(processed_repo.features)
-                aggregated_tech_stack.extend(processed_repo.tech_stack)
+        logger.info(f"Found {len(repo_candidates)} repositories")
         
+        # Process repositories concurrently; whatever is not done by the analysis deadline is cut off
+        cut_off_repos = []
+        if repo_candidates:
+            analysis_deadline = deadline.budget(ANALYSIS_BUDGET_FRACTION)
+            tasks = [asyncio.create_task(process_repository(r, timer, analysis_deadline)) for r in repo_candidates]
+            with timer.stage("analyze"):
+                await asyncio.wait(tasks, timeout=analysis_deadline.remaining())
+            for repo_info, task in zip(repo_candidates, tasks):
+                if not task.done():
+                    # The worker thread stops on its own: clones and LLM calls share the deadline
+                    task.cancel()
+                    cut_off_repos.append(repo_info["url"])
+                elif isinstance(task.exception(), DeadlineExceeded):
+                    cut_off_repos.append(repo_info["url"])
+                elif task.result():
+                    processed_repo = task.result()
+                    processed_repos.append(processed_repo)
+                    aggregated_features.extend(processed_repo.features)
+                    aggregated_tech_stack.extend(processed_repo.tech_stack)
+                elif analysis_deadline.expired():
+                    # Failed after its time ran out (e.g. the clone was killed)
+                    cut_off_repos.append(repo_info["url"])
+            if cut_off_repos:
+                logger.warning(f"Deadline reached; cut off {len(cut_off_repos)} repositories: {', '.join(cut_off_repos)}")
+
         if not processed_repos:
+            if cut_off_repos:
+                raise HTTPException(status_code=504, detail=f"No repository was analysed within the deadline; cut off: {', '.join(cut_off_repos)}")
             raise HTTPException(status_code=500, detail="Failed to process any repositories")
         
         # Deduplicate features and tech stack
@@ -144,21 +444,30 @@ async def generate_feature_ideas(request: IdeationRequest):
         if not unique_features:
             raise HTTPException(status_code=404, detail="No features extracted from the analyzed repositories")
         
-        # Generate new feature ideas
+        # Generate new feature ideas; running out of time here leaves nothing to answer with
         logger.info("Generating new feature suggestions...")
-        suggested_features = suggest_new_features_from_features("\n".join(unique_features))
+        with timer.stage("ideate"):
+            suggested_features = await asyncio.to_thread(
+                profiled(suggest_new_features_from_features), "\n".join(unique_features), deadline=deadline.budget(0.5),
+            )
 
         # Generate new tech stack suggestions # <--- NEW CALL
         logger.info("Generating new tech stack suggestions...")
-        suggested_tech_stack = suggest_new_tech_stack_from_tech_stack("\n".join(unique_tech_stack), generated_features_text=suggested_features)
+        with timer.stage("ideate"):
+            suggested_tech_stack = await asyncio.to_thread(
+                profiled(suggest_new_tech_stack_from_tech_stack), "\n".join(unique_tech_stack),
+                generated_features_text=suggested_features, deadline=deadline,
+            )
         
         # Store in database
         logger.info("Storing results in database...")
-        project_id = insert_project(f"[MultiRepo:{request.project_idea}]", "virtual")
-        insert_features(project_id, unique_features)
-        insert_tech_stack(project_id, unique_tech_stack)
-        insert_ideated_features(project_id, suggested_features)
-        insert_ideated_tech_stack(project_id, suggested_tech_stack) # <--- NEW DB INSERTION
+        with timer.stage("store"):
+            await asyncio.to_thread(
+                profiled(_store_ideation), request.project_idea, unique_features, unique_tech_stack,
+                suggested_features, suggested_tech_stack,
+            )
+        
+        response.headers["Server-Timing"] = timer.server_timing_header()
         
         logger.info("Ideation completed successfully")
         
@@ -169,21 +478,163 @@ async def generate_feature_ideas(request: IdeationRequest):
             aggregated_tech_stack=unique_tech_stack,
             suggested_features=suggested_features,
             suggested_tech_stack=suggested_tech_stack, # <--- NEW FIELD IN RESPONSE
-            total_repos_processed=len(processed_repos)
+            total_repos_processed=len(processed_repos),
+            cut_off_repos=cut_off_repos,
+            search_cut_off=search_error is not None,
         )
         
     except HTTPException:
         raise
+    except DeadlineExceeded as e:
+        logger.warning(f"Ideation cut off: {str(e)}")
+        raise HTTPException(status_code=504, detail=f"Ideation did not finish within the deadline: {str(e)}")
     except Exception as e:
         logger.error(f"Unexpected error during ideation: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+@app.get("/analytics", response_model=AnalyticsResponse, summary="Feature / Tech Stack Frequencies")
+def get_analytics(
+    kind: str = Query(TECH, pattern=f"^({FEATURE}|{TECH})$", description="'tech' or 'feature'"),
+    keyword: Optional[str] = Query(None, description="Only count projects whose idea contains this keyword (one word)"),
+    item: Optional[str] = Query(None, description="Return the items most often seen together with this one"),
+    limit: int = Query(20, ge=1, le=200),
+):
+    """
+    Most frequent tech-stack items or features across stored projects.
+
+    Served from aggregate tables maintained on insert, so the cost does not
+    grow with the number of stored rows.
+    """
+    if item:
+        results = get_cooccurring_items(kind, item, limit)
+    else:
+        try:
+            results = get_top_items(kind, keyword, limit)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return AnalyticsResponse(kind=kind, keyword=keyword, item=item, results=results)
+
+@app.post("/export", response_model=ExportResponse, summary="Export Database to Parquet")
+async def export_database(request: ExportRequest, x_admin_token: Optional[str] = Header(None)):
+    """
+    Export the database tables to Parquet files under EXPORT_DIR. Needs the
+    admin token, as exports write to the server's disk.
+
+    Rows are streamed in fixed-size record batches, so memory use does not
+    depend on table size. Only rows added since the previous export are
+    written unless `full` is set.
+    """
+    _require_admin(x_admin_token)
+    unknown = [t for t in request.tables or [] if t not in EXPORT_TABLES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown tables: {', '.join(unknown)}")
+    summary = await asyncio.to_thread(export_to_parquet, EXPORT_DIR, request.tables, request.full)
+    return ExportResponse(export_dir=EXPORT_DIR, tables=summary)
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    return [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+
+def _history_page(fetch, *args, **kwargs) -> HistoryPage:
+    try:
+        items, next_cursor = fetch(*args, **kwargs)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return HistoryPage(items=items, next_cursor=next_cursor)
+
+def _fetch_one(fetch, project_id: int, fields: Optional[str], what: str) -> Dict[str, Any]:
+    try:
+        item = fetch(project_id, _parse_fields(fields))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if item is None:
+        raise HTTPException(status_code=404, detail=f"{what} {project_id} not found")
+    return item
+
+CURSOR_QUERY = Query(None, ge=0, description="`next_cursor` of the previous page")
+
+# The history endpoints are plain functions: FastAPI runs them in its threadpool,
+# so their SQLite reads do not block the event loop that /ideate shares
+
+@app.get("/projects", response_model=HistoryPage, summary="List Stored Projects")
+def get_projects(
+    cursor: Optional[int] = CURSOR_QUERY,
+    limit: int = Query(50, ge=1, le=1000),
+    fields: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(PROJECT_FIELDS)}"),
+):
+    """Stored projects (analysed repositories and ideation results), newest first."""
+    return _history_page(list_projects, cursor, limit, _parse_fields(fields))
+
+@app.get("/projects/{project_id}", summary="Get a Stored Project")
+def get_project_by_id(project_id: int, fields: Optional[str] = Query(None)):
+    return _fetch_one(get_project, project_id, fields, "Project")
+
+@app.get("/projects/{project_id}/features", response_model=HistoryPage, summary="Features of a Project")
+def get_project_features(project_id: int, cursor: Optional[int] = CURSOR_QUERY, limit: int = Query(100, ge=1, le=1000)):
+    return _history_page(list_project_items, project_id, FEATURE, cursor, limit)
+
+@app.get("/projects/{project_id}/tech_stack", response_model=HistoryPage, summary="Tech Stack of a Project")
+def get_project_tech_stack(project_id: int, cursor: Optional[int] = CURSOR_QUERY, limit: int = Query(100, ge=1, le=1000)):
+    return _history_page(list_project_items, project_id, TECH, cursor, limit)
+
+@app.get("/ideations", response_model=HistoryPage, summary="List Past Ideation Results")
+def get_ideations(
+    cursor: Optional[int] = CURSOR_QUERY,
+    limit: int = Query(20, ge=1, le=500),
+    fields: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(IDEATION_FIELDS)}"),
+):
+    """
+    Results of earlier /ideate calls, newest first. `id` is the project id;
+    the aggregated features and tech stack are under /projects/{id}/features
+    and /projects/{id}/tech_stack.
+    """
+    return _history_page(list_ideations, cursor, limit, _parse_fields(fields))
+
+@app.get("/ideations/{project_id}", summary="Get a Past Ideation Result")
+def get_ideation_by_id(project_id: int, fields: Optional[str] = Query(None)):
+    return _fetch_one(get_ideation, project_id, fields, "Ideation")
+
+def _require_admin(token: Optional[str]):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Admin endpoints are disabled; set ADMIN_TOKEN")
+    if not _is_admin(token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@app.get("/admin/profiles", summary="List Request Profiles")
+async def get_profiles(x_admin_token: Optional[str] = Header(None)):
+    """Stored request profiles, newest first."""
+    _require_admin(x_admin_token)
+    return {"profiles": await asyncio.to_thread(list_profiles)}
+
+@app.get("/admin/profiles/{profile_id}", response_class=PlainTextResponse, summary="Get a Request Profile")
+async def get_profile(profile_id: str, x_admin_token: Optional[str] = Header(None)):
+    """
+    Folded stacks (`frame;frame;frame count` per line) of one profiled
+    request, for flamegraph.pl, speedscope or any compatible viewer.
+    """
+    _require_admin(x_admin_token)
+    folded = await asyncio.to_thread(load_profile, profile_id)
+    if folded is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    return PlainTextResponse(folded)
+
+@app.get("/admin/warmup", summary="Warm-up Scheduler Status")
+async def get_warmup_status(x_admin_token: Optional[str] = Header(None)):
+    """Whether the warm-up scheduler runs in this worker and the summary of its last cycle."""
+    _require_admin(x_admin_token)
+    return {
+        "enabled": warmup_scheduler is not None,
+        "last_cycle": warmup_scheduler.last_cycle if warmup_scheduler else None,
+    }
+
 @app.get("/status", summary="API Status")
 async def get_status():
     """Get API status and configuration"""
     return {
         "status": "active",
         "github_token_configured": bool(os.getenv("GITHUB_TOKEN")),
+        "llm_backend": os.getenv("LLM_BACKEND", "groq"),
+        "fetch_backend": FETCH_BACKEND,
+        "warmup_enabled": WARMUP_ENABLED,
         "max_repos_limit": 10,
         "database_initialized": True
     }
@@ -191,18 +642,24 @@ async def get_status():
 # Error handlers
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
-    return {
-        "error": exc.detail,
-        "status_code": exc.status_code
-    }
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={
+            "error": exc.detail,
+            "status_code": exc.status_code
+        },
+    )
 
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
     logger.error(f"Unhandled exception: {str(exc)}")
-    return {
-        "error": "Internal server error",
-        "details": str(exc)
-    }
+    return JSONResponse(
+        status_code=500,
+        content={
+            "error": "Internal server error",
+            "details": str(exc)
+        },
+    )
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Git clone + parse_repo versus streaming the repository archive (FETCH_BACKEND=archive).
+
+Builds test repositories with source files, binary assets and one oversized
+file, publishes each one twice: as a bare repository behind a local
+`git daemon` and as a tar.gz behind a local `python -m http.server`. Each
+repository is then fetched and parsed with both backends, recording wall
+time, block I/O (ru_inblock / ru_oublock of this process and its git
+children, in KB) and the bytes left on disk. Both backends must produce the
+same files.
+
+    python benchmarks/bench_fetch.py --repos 4 --files 200 --file-kb 8 --repeat 3
+
+Block I/O is only charged for data not already in the page cache, so reads
+of freshly created test data usually show as 0; writes are always counted.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from loadtest.standins import GitDaemon, free_port
+
+_GIT = ["git", "-c", "init.defaultBranch=master", "-c", "user.name=bench", "-c", "user.email=bench@localhost"]
+
+
+def make_repo(base_dir, name, files, file_kb, binary_files, rng):
+    """A bare repository and the matching tarball, like a GitHub archive download."""
+    work = os.path.join(base_dir, "work", name)
+    os.makedirs(os.path.join(work, "src"))
+    os.makedirs(os.path.join(work, "assets"))
+    with open(os.path.join(work, "README.md"), "w") as f:
+        f.write(f"# {name}\n\nBenchmark repository.\n")
+    line = "def handler(request):\n    return {'status': 'ok', 'items': list(range(10))}\n"
+    for i in range(files):
+        with open(os.path.join(work, "src", f"module_{i}.py"), "w") as f:
+            f.write(f"# module {i}\n" + line * (file_kb * 1024 // len(line)))
+    for i in range(binary_files):
+        with open(os.path.join(work, "assets", f"image_{i}.png"), "wb") as f:
+            f.write(rng.randbytes(64 * 1024))
+    with open(os.path.join(work, "data.json"), "w") as f:
+        f.write("[" + ",".join(["0"] * 600_000) + "]")  # over MAX_FILE_BYTES, skipped by both backends
+    subprocess.run(_GIT + ["init", "-q", work], check=True)
+    subprocess.run(_GIT + ["add", "."], cwd=work, check=True)
+    subprocess.run(_GIT + ["commit", "-q", "-m", "init"], cwd=work, check=True)
+    bare = os.path.join(base_dir, "bare", f"{name}.git")
+    subprocess.run(["git", "clone", "-q", "--bare", work, bare], check=True)
+    os.makedirs(os.path.join(base_dir, "tarballs"), exist_ok=True)
+    subprocess.run(
+        ["git", "archive", "--format=tar.gz", f"--prefix={name}-master/",
+         "-o", os.path.join(base_dir, "tarballs", f"{name}.tar.gz"), "HEAD"],
+        cwd=bare, check=True,
+    )
+    shutil.rmtree(work)
+
+
+def _block_io_kb():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return (own.ru_inblock + children.ru_inblock) / 2, (own.ru_oublock + children.ru_oublock) / 2
+
+
+def _disk_bytes(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+    return total
+
+
+def measure(fetch, scratch_dir):
+    os.makedirs(scratch_dir)
+    read_before, written_before = _block_io_kb()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stderr):
+        repo_data = fetch(scratch_dir)
+    elapsed = time.perf_counter() - started
+    read_after, written_after = _block_io_kb()
+    result = {
+        "wall_ms": round(elapsed * 1000, 1),
+        "read_kb": read_after - read_before,
+        "written_kb": written_after - written_before,
+        "disk_bytes": _disk_bytes(scratch_dir),
+    }
+    shutil.rmtree(scratch_dir)
+    return repo_data, result
+
+
+def _files(repo_data):
+    return {f["path"]: f["content"] for f in repo_data["files"]}, repo_data["readme"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repos", type=int, default=4)
+    parser.add_argument("--files", type=int, default=200, help="source files per repository")
+    parser.add_argument("--file-kb", type=int, default=8, help="size of each source file")
+    parser.add_argument("--binary-files", type=int, default=20, help="64 KB binary assets per repository")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    base_dir = tempfile.mkdtemp(prefix="bench-fetch-")
+    port = free_port()
+    # The archive template has to be set before the module reads it
+    os.environ["ARCHIVE_URL_TEMPLATE"] = f"http://127.0.0.1:{port}/{{repo}}.tar.gz"
+    from extractor.clone_repo import clone_repo
+    from extractor.fetch_archive import fetch_archive
+    from extractor.parse_repo import parse_repo
+
+    rng = random.Random(0)
+    names = [f"bench-{i}" for i in range(args.repos)]
+    for name in names:
+        make_repo(base_dir, name, args.files, args.file_kb, args.binary_files, rng)
+    daemon = GitDaemon(base_dir)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "http.server", str(port), "--bind", "127.0.0.1",
+         "--directory", os.path.join(base_dir, "tarballs")],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    time.sleep(0.5)
+
+    def via_git(name):
+        def fetch(scratch_dir):
+            path = clone_repo(daemon.url(name), destination=scratch_dir, clone_type="full")
+            return parse_repo(path)
+        return fetch
+
+    def via_archive(name):
+        return lambda scratch_dir: fetch_archive(daemon.url(name), clone_type="full")
+
+    runs = {"git": [], "archive": []}
+    try:
+        for _ in range(args.repeat):
+            for name in names:
+                git_data, git_result = measure(via_git(name), os.path.join(base_dir, "scratch"))
+                archive_data, archive_result = measure(via_archive(name), os.path.join(base_dir, "scratch"))
+                if _files(git_data) != _files(archive_data):
+                    raise SystemExit(f"[ERROR] Backends disagree on the contents of {name}")
+                runs["git"].append(git_result)
+                runs["archive"].append(archive_result)
+    finally:
+        server.terminate()
+        server.wait()
+        daemon.stop()
+        shutil.rmtree(base_dir, ignore_errors=True)
+
+    def total(results, key):
+        return round(sum(r[key] for r in results), 1)
+
+    summary = {
+        backend: {key: total(results, key) for key in ("wall_ms", "read_kb", "written_kb", "disk_bytes")}
+        for backend, results in runs.items()
+    }
+    print(json.dumps({
+        "config": vars(args),
+        "files_per_repo": len(git_data["files"]),
+        "runs": runs,
+        "total": summary,
+        "speedup": round(summary["git"]["wall_ms"] / max(summary["archive"]["wall_ms"], 0.1), 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for app.py.
+
+Each measurement runs in a fresh interpreter so module caches don't help.
+"lazy" is the current behaviour: importing app loads .env and imports
+FastAPI, NumPy (for the corpus index) and the warm-up scheduler, but
+builds no LLM client. "eager" reproduces what importing the extractor
+used to do on top of that: import groq and construct a Groq client.
+
+    python benchmarks/bench_import_time.py --runs 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    "lazy": "import app",
+    "eager": (
+        "import app\n"
+        "from groq import Groq\n"
+        "Groq(api_key='benchmark')"
+    ),
+}
+
+TIMER = (
+    "import time\n"
+    "_t0 = time.perf_counter()\n"
+    "{body}\n"
+    "print(time.perf_counter() - _t0)"
+)
+
+
+def time_scenario(body, runs):
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", TIMER.format(body=body)],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    report = {}
+    for name, body in SCENARIOS.items():
+        samples = time_scenario(body, args.runs)
+        report[name] = {
+            "median_ms": round(statistics.median(samples) * 1000, 1),
+            "min_ms": round(min(samples) * 1000, 1),
+            "max_ms": round(max(samples) * 1000, 1),
+        }
+
+    report["saved_ms"] = round(report["eager"]["median_ms"] - report["lazy"]["median_ms"], 1)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
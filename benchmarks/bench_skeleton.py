@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Prompt-token reduction and extraction quality of the skeleton summarizer mode.
+
+The corpus is a fixed list of local repository directories (default: this
+repository). For each one the map-step input is built in "raw" and
+"skeleton" mode and its size compared. With --extract, the full extraction
+also runs in both modes against the configured LLM backend (LLM_BACKEND)
+and the extracted feature / tech-stack items are compared: `recall` is the
+share of raw-mode items that skeleton mode also found.
+
+    python benchmarks/bench_skeleton.py path/to/repo1 path/to/repo2 --extract
+"""
+
+import argparse
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from extractor.parse_repo import parse_repo
+from extractor.skeleton import skeletonize_repo_data
+from extractor.summarizer import build_prompt_input, extract_features_and_techstack
+from utils.helpers import estimate_tokens, parse_llm_summary
+
+
+def _items(summary):
+    features, tech_stack = parse_llm_summary(summary)
+    return {x.split(":", 1)[0].strip(" *_`").lower() for x in features + tech_stack}
+
+
+def bench_repo(path, extract):
+    repo_data = parse_repo(path)
+    raw_tokens = estimate_tokens(build_prompt_input(repo_data))
+    skeleton_tokens = estimate_tokens(build_prompt_input(skeletonize_repo_data(repo_data)))
+    result = {
+        "repo": path,
+        "files": len(repo_data["files"]),
+        "raw_tokens": raw_tokens,
+        "skeleton_tokens": skeleton_tokens,
+        "reduction": round(raw_tokens / max(skeleton_tokens, 1), 2),
+    }
+    if extract:
+        raw_items = _items(extract_features_and_techstack(repo_data, mode="raw"))
+        skeleton_items = _items(extract_features_and_techstack(repo_data, mode="skeleton"))
+        union = raw_items | skeleton_items
+        result.update(
+            raw_items=len(raw_items),
+            skeleton_items=len(skeleton_items),
+            recall=round(len(raw_items & skeleton_items) / len(raw_items), 2) if raw_items else None,
+            jaccard=round(len(raw_items & skeleton_items) / len(union), 2) if union else None,
+        )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("repos", nargs="*", default=[ROOT], help="local repository directories")
+    parser.add_argument("--extract", action="store_true", help="also run both extractions and compare the results")
+    args = parser.parse_args()
+
+    results = [bench_repo(path, args.extract) for path in args.repos]
+    total_raw = sum(r["raw_tokens"] for r in results)
+    total_skeleton = sum(r["skeleton_tokens"] for r in results)
+    print(json.dumps({
+        "results": results,
+        "total_raw_tokens": total_raw,
+        "total_skeleton_tokens": total_skeleton,
+        "total_reduction": round(total_raw / max(total_skeleton, 1), 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Throughput of /ideate as the number of uvicorn workers grows.
+
+Runs fully offline: a fake GitHub search API returns local bare git repos
+(cloned over file://) and the fake LLM backend burns a fixed amount of CPU
+per call, so each request costs real CPU time like parsing and inference
+would (see loadtest/standins.py). For every worker count the server is restarted against fresh data
+directories and driven with 2 x workers concurrent clients.
+
+    python benchmarks/worker_scaling.py --duration 20 --spin-ms 50
+
+Prints a JSON report; `scaling_efficiency` close to 1.0 means throughput
+grows linearly with the worker count.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from loadtest.standins import FakeGitHub, make_bare_repos, start_api
+
+
+def drive(base_url, concurrency, duration):
+    latencies, errors = [], []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client(worker_id):
+        n = 0
+        while time.perf_counter() < stop_at:
+            payload = {"project_idea": f"load test idea {worker_id} {n}", "max_repos": 1, "use_local_index": False}
+            started = time.perf_counter()
+            try:
+                ok = requests.post(base_url + "/ideate", json=payload, timeout=120).status_code == 200
+            except requests.RequestException:
+                ok = False
+            with lock:
+                (latencies if ok else errors).append(time.perf_counter() - started)
+            n += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1) if latencies else None,
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 1) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per worker count")
+    parser.add_argument("--spin-ms", type=float, default=50.0, help="CPU time burnt per fake LLM call")
+    parser.add_argument("--repos", type=int, default=8)
+    args = parser.parse_args()
+
+    worker_counts = sorted({1, *[2 ** i for i in range(1, 8) if 2 ** i < args.max_workers], args.max_workers})
+    base_dir = tempfile.mkdtemp(prefix="worker-scaling-")
+    names = make_bare_repos(base_dir, args.repos)
+    github = FakeGitHub([
+        {"full_name": f"bench/{n}", "html_url": f"file://{os.path.join(base_dir, 'bare', n)}.git"} for n in names
+    ])
+    server_env = {
+        "FAKE_LLM_SPIN_MS": str(args.spin_ms),
+        # Measure the full pipeline on every request
+        "SEARCH_CACHE_TTL_SECONDS": "0",
+        "ANALYSIS_TTL_SECONDS": "0",
+    }
+
+    results = []
+    try:
+        for workers in worker_counts:
+            data_dir = os.path.join(base_dir, f"data-{workers}")
+            os.makedirs(data_dir)
+            proc, base_url = start_api(data_dir, github.url, workers=workers, extra_env=server_env)
+            try:
+                # Warm-up: clone every repository once so clones aren't part of the measurement
+                drive(base_url, 1, 2.0)
+                result = drive(base_url, 2 * workers, args.duration)
+            finally:
+                proc.terminate()
+                proc.wait()
+            result["workers"] = workers
+            results.append(result)
+            print(f"[INFO] {workers} worker(s): {result['throughput_rps']} req/s", file=sys.stderr)
+    finally:
+        github.stop()
+        shutil.rmtree(base_dir, ignore_errors=True)
+
+    single = results[0]["throughput_rps"] or 1e-9
+    for result in results:
+        result["speedup"] = round(result["throughput_rps"] / single, 2)
+        result["scaling_efficiency"] = round(result["speedup"] / result["workers"], 2)
+    print(json.dumps({"cpu_count": os.cpu_count(), "spin_ms": args.spin_ms, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
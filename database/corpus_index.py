@@ -0,0 +1,342 @@
+# database/corpus_index.py
+"""
+Local similarity index over analysed repositories.
+
+Each repository (features, tech stack, README) becomes a hashed bag-of-words
+vector. Vectors are kept sparse in memory, as flat NumPy arrays of
+(bucket, value) pairs that new rows are appended to, together with the
+per-bucket document frequencies. Adding a document is O(its size), and a
+query is one pass over the stored pairs with TF-IDF weights applied on the
+fly.
+
+On disk the index is a compacted snapshot (`.npz`) plus an append-only log
+of the updates made since (`<path>.<generation>.log`, one JSON line per
+document). An update appends one line; every COMPACT_EVERY updates the log
+is folded into a new snapshot generation and removed.
+
+Several worker processes may share the files: updates are appended under a
+file lock, and each process reads only the log lines it has not seen yet,
+reloading the snapshot only after another process compacted it.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from database.db import DB_NAME
+from utils.file_lock import FileLock
+
+INDEX_PATH = os.getenv("CORPUS_INDEX_PATH", "corpus_index.npz")
+DIM = 1 << 12
+README_CHARS = 5_000
+# Updates appended to the log before it is folded into a new snapshot
+COMPACT_EVERY = int(os.getenv("CORPUS_INDEX_COMPACT_EVERY", "500"))
+
+_TOKEN_RX = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+def _tokens(text):
+    return _TOKEN_RX.findall(text.lower())
+
+def _hash_vector(text, dim):
+    """Sublinear term frequencies of `text`, hashed into `dim` buckets (stable across processes)."""
+    vec = np.zeros(dim, dtype=np.float32)
+    for token in _tokens(text):
+        vec[zlib.crc32(token.encode("utf-8")) % dim] += 1.0
+    nz = vec > 0
+    vec[nz] = 1.0 + np.log(vec[nz])
+    return vec
+
+def document_text(name, features, tech_stack, readme=""):
+    """Text indexed for a repository; tech stack items are repeated to weigh them up."""
+    name_words = re.sub(r"[/_\-.]", " ", name)
+    return "\n".join([name_words, *features, *tech_stack, *tech_stack, readme[:README_CHARS]])
+
+def _grow(array, size):
+    """`array` with room for at least `size` entries (capacity doubles)."""
+    if size <= len(array):
+        return array
+    grown = np.zeros(max(size, 2 * len(array)), dtype=array.dtype)
+    grown[: len(array)] = array
+    return grown
+
+class CorpusIndex:
+    def __init__(self, path=INDEX_PATH, dim=DIM):
+        self.path = path
+        self.dim = dim
+        self._lock = threading.Lock()
+        self._reset()
+        self._generation = 0
+        self._loaded_stamp = None   # (mtime_ns, size) of the snapshot held in memory
+        self._log_offset = 0        # bytes of the current log already applied
+        self._log_records = 0
+        self._refresh()
+
+    def _reset(self):
+        # Stored (bucket, value) pairs of every row, with the row each pair belongs to;
+        # entries beyond self._nnz are spare capacity
+        self._indices = np.zeros(1024, dtype=np.int32)
+        self._values = np.zeros(1024, dtype=np.float32)
+        self._owners = np.zeros(1024, dtype=np.int32)
+        self._nnz = 0
+        self._spans = []       # (start, end) of each row's pairs
+        self._alive = np.zeros(16, dtype=bool)   # False once a row was re-indexed
+        self._df = np.zeros(self.dim, dtype=np.int32)
+        self._docs = []        # metadata per row: url, name, features, tech_stack
+        self._rows = {}        # url -> live row
+        self._weighted_norms = None
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _log_path(self, generation=None):
+        return f"{self.path}.{self._generation if generation is None else generation}.log"
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _refresh(self):
+        """Catch up with other processes: reload a replaced snapshot, then apply new log lines."""
+        stamp = self._file_stamp()
+        if stamp is not None and stamp != self._loaded_stamp:
+            self._load()
+            self._loaded_stamp = stamp
+        self._read_log()
+
+    def _load(self):
+        with np.load(self.path) as data:
+            if int(data["dim"]) != self.dim:
+                print(f"[WARN] Ignoring corpus index {self.path}: built with dim={int(data['dim'])}")
+                return
+            docs = json.loads(str(data["docs"]))
+            indptr = data["indptr"].astype(np.int64)
+            self._reset()
+            nnz = int(indptr[-1]) if len(indptr) else 0
+            self._indices = _grow(self._indices, nnz)
+            self._values = _grow(self._values, nnz)
+            self._owners = _grow(self._owners, nnz)
+            self._indices[:nnz] = data["indices"]
+            self._values[:nnz] = data["values"]
+            self._owners[:nnz] = np.repeat(np.arange(len(docs), dtype=np.int32), np.diff(indptr))
+            self._nnz = nnz
+            self._spans = list(zip(indptr[:-1].tolist(), indptr[1:].tolist()))
+            self._alive = _grow(self._alive, len(docs))
+            self._alive[: len(docs)] = True
+            self._df = data["df"].astype(np.int32)
+            self._docs = docs
+            self._generation = int(data["generation"]) if "generation" in data else 0
+        self._rows = {doc["url"]: i for i, doc in enumerate(self._docs)}
+        self._log_offset = 0
+        self._log_records = 0
+
+    def _read_log(self):
+        """Apply the complete log lines written since the last read."""
+        path = self._log_path()
+        try:
+            if os.path.getsize(path) <= self._log_offset:
+                return
+            with open(path, "rb") as f:
+                f.seek(self._log_offset)
+                data = f.read()
+        except FileNotFoundError:
+            # Not written yet, or compacted away; the new snapshot is picked up next time
+            return
+        # A line still being appended by another process is left for the next read
+        complete = data[: data.rfind(b"\n") + 1]
+        for line in complete.splitlines():
+            record = json.loads(line)
+            self._apply(record["doc"], np.array(record["i"], dtype=np.int32), np.array(record["v"], dtype=np.float32))
+            self._log_records += 1
+        self._log_offset += len(complete)
+
+    def _apply(self, doc, indices, values):
+        """Append one document as a new row; an earlier row for its URL is retired."""
+        row = len(self._docs)
+        start, end = self._nnz, self._nnz + len(indices)
+        self._indices = _grow(self._indices, end)
+        self._values = _grow(self._values, end)
+        self._owners = _grow(self._owners, end)
+        self._indices[start:end] = indices
+        self._values[start:end] = values
+        self._owners[start:end] = row
+        self._nnz = end
+        self._spans.append((start, end))
+        self._alive = _grow(self._alive, row + 1)
+        self._alive[row] = True
+        self._docs.append(doc)
+
+        old = self._rows.get(doc["url"])
+        if old is not None:
+            self._alive[old] = False
+            old_start, old_end = self._spans[old]
+            self._df[self._indices[old_start:old_end]] -= 1
+        self._rows[doc["url"]] = row
+        self._df[indices] += 1
+        self._weighted_norms = None
+
+    def save(self):
+        with FileLock(self.path + ".lock"), self._lock:
+            self._save()
+
+    def _save(self):
+        """Write a compacted snapshot (live rows only) as the next generation and drop the old log."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        live = sorted(self._rows.values())
+        spans = [self._spans[row] for row in live]
+        lengths = np.array([end - start for start, end in spans], dtype=np.int64)
+        indptr = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        take = np.concatenate([np.arange(start, end) for start, end in spans]) if spans else np.zeros(0, dtype=np.int64)
+        old_log = self._log_path()
+        tmp_path = f"{self.path}.{os.getpid()}.tmp.npz"
+        np.savez(
+            tmp_path,
+            dim=self.dim,
+            generation=self._generation + 1,
+            indptr=indptr,
+            indices=self._indices[take].astype(np.int32),
+            values=self._values[take].astype(np.float16),
+            df=self._df,
+            docs=np.array(json.dumps([self._docs[row] for row in live])),
+        )
+        os.replace(tmp_path, self.path)
+        try:
+            os.remove(old_log)
+        except FileNotFoundError:
+            pass
+        self._load()
+        self._loaded_stamp = self._file_stamp()
+
+    def _idf(self):
+        n = len(self._rows)
+        return (np.log((1.0 + n) / (1.0 + self._df)) + 1.0).astype(np.float32)
+
+    def add(self, url, name, features, tech_stack, readme="", persist=True):
+        """
+        Index (or re-index) one repository. Persisted immediately unless
+        `persist` is False, by appending one line to the log.
+        """
+        vec = _hash_vector(document_text(name, features, tech_stack, readme), self.dim)
+        indices = np.nonzero(vec)[0].astype(np.int32)
+        values = vec[indices]
+        doc = {
+            "url": url,
+            "name": name,
+            "features": list(features),
+            "tech_stack": list(tech_stack),
+            "indexed_at": time.time(),
+        }
+        if not persist:
+            with self._lock:
+                self._apply(doc, indices, values)
+            return
+        line = json.dumps({"doc": doc, "i": indices.tolist(), "v": [round(float(v), 4) for v in values]}) + "\n"
+        with FileLock(self.path + ".lock"), self._lock:
+            self._refresh()
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self._log_path(), "ab") as f:
+                f.write(line.encode("utf-8"))
+            # Applied through the log, exactly as other processes will see it
+            self._read_log()
+            if self._log_records >= COMPACT_EVERY:
+                self._save()
+
+    def search(self, text, k=5, min_score=0.0, exclude=()):
+        """
+        Top-`k` stored repositories most similar to `text` by TF-IDF cosine.
+        Returns the stored metadata plus a `score`, best first.
+        """
+        with self._lock:
+            self._refresh()
+            if not self._rows:
+                return []
+            idf = self._idf()
+            query = _hash_vector(text, self.dim) * idf
+            query_norm = np.linalg.norm(query)
+            if query_norm == 0:
+                return []
+            n_rows = len(self._docs)
+            indices, owners = self._indices[: self._nnz], self._owners[: self._nnz]
+            weighted = self._values[: self._nnz] * idf[indices]
+            if self._weighted_norms is None:
+                self._weighted_norms = np.sqrt(np.bincount(owners, weights=weighted * weighted, minlength=n_rows))
+            dots = np.bincount(owners, weights=weighted * query[indices], minlength=n_rows)
+            scores = dots / (np.maximum(self._weighted_norms, 1e-9) * query_norm)
+            scores[~self._alive[:n_rows]] = 0.0
+            docs = self._docs
+
+        results = []
+        for row in np.argsort(-scores):
+            score = float(scores[row])
+            if score <= 0 or score < min_score or len(results) >= k:
+                break
+            if docs[row]["url"] in exclude:
+                continue
+            results.append({**docs[row], "score": round(score, 4)})
+        return results
+
+    def get(self, url, max_age_seconds=None):
+        """Stored analysis for `url`, or None if absent or older than `max_age_seconds`."""
+        with self._lock:
+            self._refresh()
+            row = self._rows.get(url)
+            doc = self._docs[row] if row is not None else None
+        if doc is None:
+            return None
+        if max_age_seconds is not None and time.time() - doc.get("indexed_at", 0) > max_age_seconds:
+            return None
+        return doc
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_index():
+    """Process-wide index, loaded from disk on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = CorpusIndex()
+    return _index
+
+def rebuild_from_db(db_name=DB_NAME):
+    """
+    Index every real (non-[MultiRepo:...]) project stored in the database.
+    READMEs are not stored there, so these entries use features and tech stack only.
+    """
+    import sqlite3
+    conn = sqlite3.connect(db_name)
+    c = conn.cursor()
+    index = get_index()
+    projects = c.execute("SELECT id, repo_url FROM projects WHERE repo_url NOT LIKE '[MultiRepo:%'").fetchall()
+    for project_id, url in projects:
+        features = [r[0] for r in c.execute("SELECT feature FROM features WHERE project_id = ?", (project_id,))]
+        tech_stack = [r[0] for r in c.execute("SELECT stack_item FROM tech_stack WHERE project_id = ?", (project_id,))]
+        name = "/".join(url.rstrip("/").split("/")[-2:])
+        index.add(url, name, features, tech_stack, persist=False)
+    conn.close()
+    index.save()
+    return len(projects)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Manage the local corpus index")
+    parser.add_argument("--rebuild", action="store_true", help="index all projects stored in the database")
+    parser.add_argument("--query", help="print the best matches for a project idea")
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.rebuild:
+        print(f"[INFO] Indexed {rebuild_from_db()} projects into {INDEX_PATH}")
+    if args.query:
+        for match in get_index().search(args.query, k=args.k):
+            print(f"{match['score']:.3f}  {match['name']}  {match['url']}")
@@ -1,14 +1,51 @@
 # database/db.py
 
+import os
+import re
 import sqlite3
+from contextlib import contextmanager
 from datetime import datetime
+from itertools import combinations
 
-DB_NAME = "extracted_data.db"
+from utils.file_lock import FileLock
+
+DB_NAME = os.getenv("DB_PATH", "extracted_data.db")
+BUSY_TIMEOUT_SECONDS = 30
+
+# Kinds of items tracked by the analytics tables
+FEATURE = "feature"
+TECH = "tech"
+
+_MULTI_REPO_RX = re.compile(r"^\[MultiRepo:(.*)\]$", flags=re.DOTALL)
+_KEYWORD_RX = re.compile(r"[a-z0-9][a-z0-9+#.\-]*")
+_STOPWORDS = {"a", "an", "and", "app", "for", "in", "of", "on", "or", "the", "to", "with"}
+
+def _connect():
+    return sqlite3.connect(DB_NAME, timeout=BUSY_TIMEOUT_SECONDS)
+
+@contextmanager
+def _write_transaction():
+    """
+    Cursor for one write transaction, committed on exit. Writers are
+    serialized across threads, worker processes and containers sharing the
+    database file by a lock file, so they queue instead of failing with
+    "database is locked".
+    """
+    with FileLock(DB_NAME + ".lock"):
+        conn = _connect()
+        try:
+            yield conn.cursor()
+            conn.commit()
+        finally:
+            conn.close()
 
 def init_db():
-    conn = sqlite3.connect(DB_NAME)
+    conn = _connect()
     c = conn.cursor()
 
+    # WAL lets readers in other workers proceed while a write is in progress
+    c.execute("PRAGMA journal_mode=WAL")
+
     # Create projects table
     c.execute('''
         CREATE TABLE IF NOT EXISTS projects (
@@ -58,53 +95,347 @@ def init_db():
         )
     """)
 
+    # One row per /ideate request, kept to learn which ideas are asked for most
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS idea_requests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            idea TEXT NOT NULL,
+            requested_at TEXT NOT NULL
+        )
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_idea_requests_time ON idea_requests (requested_at)")
+
+    # Materialized analytics, maintained by insert_features / insert_tech_stack.
+    # Counts are per project: an item counts once however often a project lists it.
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS item_counts (
+            kind TEXT NOT NULL,
+            item TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (kind, item)
+        )
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS keyword_item_counts (
+            kind TEXT NOT NULL,
+            keyword TEXT NOT NULL,
+            item TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (kind, keyword, item)
+        )
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS item_cooccurrence (
+            kind TEXT NOT NULL,
+            item_a TEXT NOT NULL,
+            item_b TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (kind, item_a, item_b)
+        )
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_item_counts_top ON item_counts (kind, count DESC)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_keyword_item_counts_top ON keyword_item_counts (kind, keyword, count DESC)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_item_cooccurrence_b ON item_cooccurrence (kind, item_b)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_features_project ON features (project_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_tech_stack_project ON tech_stack (project_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_ideated_features_project ON ideated_features (project_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_ideated_tech_stack_project ON ideated_tech_stack (project_id)")
+
     conn.commit()
+
+    # One-off backfill for databases created before the analytics tables existed
+    has_items = c.execute("SELECT 1 FROM item_counts LIMIT 1").fetchone()
+    has_rows = c.execute("SELECT 1 FROM features UNION ALL SELECT 1 FROM tech_stack LIMIT 1").fetchone()
     conn.close()
+    if has_rows and not has_items:
+        rebuild_analytics()
 
 def insert_project(repo_url, repo_path):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
+    with _write_transaction() as c:
+        c.execute(
+            "INSERT INTO projects (repo_url, repo_path, created_at) VALUES (?, ?, ?)",
+            (repo_url, repo_path, datetime.now().isoformat())
+        )
+        return c.lastrowid
+
+def insert_features(project_id, features):
+    with _write_transaction() as c:
+        _update_analytics(c, FEATURE, project_id, features)
+        for feature in features:
+            c.execute("INSERT INTO features (project_id, feature) VALUES (?, ?)", (project_id, feature))
 
-    c.execute(
-        "INSERT INTO projects (repo_url, repo_path, created_at) VALUES (?, ?, ?)",
-        (repo_url, repo_path, datetime.now().isoformat())
+def insert_tech_stack(project_id, stack_items):
+    with _write_transaction() as c:
+        _update_analytics(c, TECH, project_id, stack_items)
+        for item in stack_items:
+            c.execute("INSERT INTO tech_stack (project_id, stack_item) VALUES (?, ?)", (project_id, item))
+
+###############################################################################
+# Analytics
+###############################################################################
+def normalize_item(kind, text):
+    """
+    Canonical form used for counting: lower-cased, bullets and markdown
+    emphasis removed; features are reduced to their "Label" part of
+    "Label: description".
+    """
+    item = text.strip().strip("*_`").strip()
+    if kind == FEATURE:
+        item = item.split(":", 1)[0]
+    item = item.strip("*_` ").lower()
+    return re.sub(r"\s+", " ", item)[:200]
+
+def idea_keywords(project_idea):
+    """Keywords of a project idea as used by the per-keyword counts."""
+    words = _KEYWORD_RX.findall(project_idea.lower())
+    return sorted({w for w in words if w not in _STOPWORDS and len(w) > 1})
+
+def _project_keywords(c, project_id):
+    row = c.execute("SELECT repo_url FROM projects WHERE id = ?", (project_id,)).fetchone()
+    match = _MULTI_REPO_RX.match(row[0]) if row and row[0] else None
+    return idea_keywords(match.group(1)) if match else []
+
+def _update_analytics(c, kind, project_id, raw_items, existing=None):
+    """
+    Incrementally fold one insert into the aggregate tables. Runs on the
+    caller's cursor, so counts commit atomically with the rows themselves.
+    `existing` is the project's already-counted items (looked up when None).
+    """
+    if existing is None:
+        table, column = ("features", "feature") if kind == FEATURE else ("tech_stack", "stack_item")
+        existing = {
+            normalize_item(kind, row[0])
+            for row in c.execute(f"SELECT {column} FROM {table} WHERE project_id = ?", (project_id,))
+        }
+    new_items = sorted({normalize_item(kind, i) for i in raw_items} - existing - {""})
+    if not new_items:
+        return
+
+    c.executemany(
+        "INSERT INTO item_counts (kind, item, count) VALUES (?, ?, 1) "
+        "ON CONFLICT(kind, item) DO UPDATE SET count = count + 1",
+        [(kind, item) for item in new_items],
     )
 
-    project_id = c.lastrowid
-    conn.commit()
-    conn.close()
-    return project_id
+    keywords = _project_keywords(c, project_id)
+    c.executemany(
+        "INSERT INTO keyword_item_counts (kind, keyword, item, count) VALUES (?, ?, ?, 1) "
+        "ON CONFLICT(kind, keyword, item) DO UPDATE SET count = count + 1",
+        [(kind, kw, item) for kw in keywords for item in new_items],
+    )
 
-def insert_features(project_id, features):
-    conn = sqlite3.connect(DB_NAME)
+    # Pairs among the new items, plus each new item with those already stored
+    pairs = list(combinations(new_items, 2))
+    pairs += [tuple(sorted((n, e))) for n in new_items for e in existing if e]
+    c.executemany(
+        "INSERT INTO item_cooccurrence (kind, item_a, item_b, count) VALUES (?, ?, ?, 1) "
+        "ON CONFLICT(kind, item_a, item_b) DO UPDATE SET count = count + 1",
+        [(kind, a, b) for a, b in pairs],
+    )
+
+def rebuild_analytics():
+    """Recompute all analytics tables from scratch (full scan; for backfills only)."""
+    with _write_transaction() as c:
+        _rebuild_analytics(c)
+
+def _rebuild_analytics(c):
+    c.execute("DELETE FROM item_counts")
+    c.execute("DELETE FROM keyword_item_counts")
+    c.execute("DELETE FROM item_cooccurrence")
+    for kind, table, column in ((FEATURE, "features", "feature"), (TECH, "tech_stack", "stack_item")):
+        items_by_project = {}
+        for project_id, value in c.execute(f"SELECT project_id, {column} FROM {table} ORDER BY id").fetchall():
+            items_by_project.setdefault(project_id, []).append(value)
+        for project_id, values in items_by_project.items():
+            _update_analytics(c, kind, project_id, values, existing=set())
+
+def get_top_items(kind, keyword=None, limit=20):
+    """
+    Most common items of `kind`, optionally among projects whose idea contains
+    `keyword`. The keyword is normalized like the stored ones (`idea_keywords`);
+    raises ValueError unless it is exactly one such keyword.
+    """
+    if keyword:
+        keywords = idea_keywords(keyword)
+        if len(keywords) != 1:
+            raise ValueError(
+                f"Keyword '{keyword}' must be a single word that is not a stopword"
+                + (f" (found: {', '.join(keywords)})" if keywords else "")
+            )
+        keyword = keywords[0]
+    conn = _connect()
     c = conn.cursor()
-    for feature in features:
-        c.execute("INSERT INTO features (project_id, feature) VALUES (?, ?)", (project_id, feature))
-    conn.commit()
+    if keyword:
+        rows = c.execute(
+            "SELECT item, count FROM keyword_item_counts WHERE kind = ? AND keyword = ? "
+            "ORDER BY count DESC LIMIT ?",
+            (kind, keyword, limit),
+        ).fetchall()
+    else:
+        rows = c.execute(
+            "SELECT item, count FROM item_counts WHERE kind = ? ORDER BY count DESC LIMIT ?",
+            (kind, limit),
+        ).fetchall()
     conn.close()
+    return [{"item": item, "count": count} for item, count in rows]
 
-def insert_tech_stack(project_id, stack_items):
-    conn = sqlite3.connect(DB_NAME)
+def get_cooccurring_items(kind, item, limit=20):
+    """Items most often listed by the same project as `item`."""
+    item = normalize_item(kind, item)
+    conn = _connect()
     c = conn.cursor()
-    for item in stack_items:
-        c.execute("INSERT INTO tech_stack (project_id, stack_item) VALUES (?, ?)", (project_id, item))
-    conn.commit()
+    rows = c.execute(
+        "SELECT item_b AS other, count FROM item_cooccurrence WHERE kind = ? AND item_a = ? "
+        "UNION ALL "
+        "SELECT item_a AS other, count FROM item_cooccurrence WHERE kind = ? AND item_b = ? "
+        "ORDER BY count DESC LIMIT ?",
+        (kind, item, kind, item, limit),
+    ).fetchall()
     conn.close()
+    return [{"item": other, "count": count} for other, count in rows]
 
-def insert_ideated_features(project_id: int, idea_text: str):
-    conn = sqlite3.connect("extracted_data.db")
-    c = conn.cursor()
-    c.execute(
-        "INSERT INTO ideated_features (project_id, ideas) VALUES (?, ?)",
-        (project_id, idea_text),
+# History browsing. Pages are keyset-paginated on an indexed id ("after the
+# last id seen" instead of OFFSET), so every page costs the same however deep.
+PROJECT_FIELDS = {
+    "id": "p.id",
+    "repo_url": "p.repo_url",
+    "repo_path": "p.repo_path",
+    "created_at": "p.created_at",
+}
+IDEATION_FIELDS = {
+    "id": "f.project_id",
+    "project_idea": "p.repo_url",
+    "created_at": "p.created_at",
+    "suggested_features": "f.ideas",
+    "suggested_tech_stack": (
+        "(SELECT suggested_tech_stack_text FROM ideated_tech_stack t "
+        "WHERE t.project_id = f.project_id ORDER BY t.id DESC LIMIT 1)"
+    ),
+}
+# Item kind -> (table, column)
+ITEM_TABLES = {FEATURE: ("features", "feature"), TECH: ("tech_stack", "stack_item")}
+
+def _keyset_page(from_clause, key, columns, fields=None, cursor=None, limit=50,
+                 where="", params=(), ascending=False):
+    """
+    One page of rows as dicts with the requested `fields` (always including
+    "id"), and the cursor for the next page (None on the last page). Only the
+    selected columns are read, so large text columns cost nothing unless asked for.
+    """
+    fields = list(dict.fromkeys(fields or columns))
+    unknown = [f for f in fields if f not in columns]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(columns)}")
+    if "id" not in fields:
+        fields.insert(0, "id")
+
+    conditions = [where] if where else []
+    args = list(params)
+    if cursor is not None:
+        conditions.append(f"{key} {'>' if ascending else '<'} ?")
+        args.append(cursor)
+    sql = (
+        f"SELECT {', '.join(f'{columns[f]} AS {f}' for f in fields)} FROM {from_clause}"
+        + (f" WHERE {' AND '.join(conditions)}" if conditions else "")
+        + f" ORDER BY {key} {'ASC' if ascending else 'DESC'} LIMIT ?"
     )
-    conn.commit()
+    # One extra row tells whether there is a next page without another query
+    args.append(limit + 1)
+    conn = _connect()
+    rows = conn.execute(sql, args).fetchall()
+    conn.close()
+
+    items = [dict(zip(fields, row)) for row in rows[:limit]]
+    next_cursor = items[-1]["id"] if len(rows) > limit else None
+    return items, next_cursor
+
+def list_projects(cursor=None, limit=50, fields=None):
+    """Stored projects, newest first."""
+    return _keyset_page("projects p", "p.id", PROJECT_FIELDS, fields, cursor, limit)
+
+def get_project(project_id, fields=None):
+    items, _ = _keyset_page("projects p", "p.id", PROJECT_FIELDS, fields, limit=1,
+                            where="p.id = ?", params=(project_id,))
+    return items[0] if items else None
+
+def list_project_items(project_id, kind, cursor=None, limit=100):
+    """Features or tech-stack items of one project, in the order they were stored."""
+    table, column = ITEM_TABLES[kind]
+    return _keyset_page(
+        table, "id", {"id": "id", "item": column}, cursor=cursor, limit=limit,
+        where="project_id = ?", params=(project_id,), ascending=True,
+    )
+
+def _ideation_rows(items):
+    for item in items:
+        if "project_idea" in item:
+            match = _MULTI_REPO_RX.match(item["project_idea"] or "")
+            item["project_idea"] = match.group(1) if match else item["project_idea"]
+    return items
+
+def list_ideations(cursor=None, limit=50, fields=None):
+    """Stored /ideate results, newest first."""
+    items, next_cursor = _keyset_page(
+        "ideated_features f JOIN projects p ON p.id = f.project_id", "f.project_id",
+        IDEATION_FIELDS, fields, cursor, limit,
+    )
+    return _ideation_rows(items), next_cursor
+
+def get_ideation(project_id, fields=None):
+    items, _ = _keyset_page(
+        "ideated_features f JOIN projects p ON p.id = f.project_id", "f.project_id",
+        IDEATION_FIELDS, fields, limit=1, where="f.project_id = ?", params=(project_id,),
+    )
+    return _ideation_rows(items)[0] if items else None
+
+def insert_idea_request(idea):
+    with _write_transaction() as c:
+        c.execute(
+            "INSERT INTO idea_requests (idea, requested_at) VALUES (?, ?)",
+            (idea, datetime.now().isoformat()),
+        )
+
+def prune_idea_requests(before):
+    """Delete request log rows older than `before` (a datetime). Returns how many were deleted."""
+    with _write_transaction() as c:
+        return c.execute("DELETE FROM idea_requests WHERE requested_at < ?", (before.isoformat(),)).rowcount
+
+def get_frequent_ideas(since, limit=20, min_count=2):
+    """
+    Project ideas asked for at least `min_count` times since `since` (a
+    datetime), most frequent first, from the request log and the stored
+    [MultiRepo:...] projects. Ideas differing only in case or spacing are
+    merged; the most recent wording is returned.
+    """
+    conn = _connect()
+    rows = conn.execute(
+        "SELECT idea, requested_at FROM idea_requests WHERE requested_at >= ? "
+        "UNION ALL "
+        # Stored ideations only count from before the request log existed, or they would count twice
+        "SELECT repo_url, created_at FROM projects WHERE repo_url LIKE '[MultiRepo:%' AND created_at >= ? "
+        "AND created_at < COALESCE((SELECT MIN(requested_at) FROM idea_requests), '9999')",
+        (since.isoformat(), since.isoformat()),
+    ).fetchall()
     conn.close()
 
+    counts = {}
+    for text, at in rows:
+        match = _MULTI_REPO_RX.match(text)
+        idea = match.group(1) if match else text
+        key = " ".join(idea.lower().split())
+        count, latest, wording = counts.get(key, (0, "", idea))
+        counts[key] = (count + 1, max(latest, at), idea if at >= latest else wording)
+    frequent = sorted(counts.values(), key=lambda c: (c[0], c[1]), reverse=True)
+    return [{"idea": wording, "count": count} for count, _, wording in frequent if count >= min_count][:limit]
+
+def insert_ideated_features(project_id: int, idea_text: str):
+    with _write_transaction() as c:
+        c.execute(
+            "INSERT INTO ideated_features (project_id, ideas) VALUES (?, ?)",
+            (project_id, idea_text),
+        )
+
 # New function to insert suggested tech stack
 def insert_ideated_tech_stack(project_id: int, suggested_tech_stack_text: str):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("INSERT INTO ideated_tech_stack (project_id, suggested_tech_stack_text) VALUES (?, ?)", (project_id, suggested_tech_stack_text))
-    conn.commit()
-    conn.close()
\ No newline at end of file
+    with _write_transaction() as cursor:
+        cursor.execute("INSERT INTO ideated_tech_stack (project_id, suggested_tech_stack_text) VALUES (?, ?)", (project_id, suggested_tech_stack_text))
\ No newline at end of file
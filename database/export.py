@@ -0,0 +1,187 @@
+# database/export.py
+"""
+Columnar export of the extraction database to Parquet.
+
+Each table is read through one cursor in fixed-size batches. Every batch is
+converted to an Arrow RecordBatch and appended to the current Parquet file,
+so memory use is bounded by the batch size, not the table size. Each run
+writes a new Hive-style partition:
+
+    <out_dir>/<table>/export_id=<UTC timestamp>/part-00000.parquet
+
+Every partition can then be read as one dataset, e.g. with
+`pyarrow.dataset.dataset(out_dir + "/features", partitioning="hive")`.
+
+Exports are incremental. `<out_dir>/_watermarks.json` holds the highest row
+id already exported per table, and a run only covers rows above it. Pass
+`full=True` to export everything again: the table is then written to a
+staging directory and swapped in for `<out_dir>/<table>`, replacing its
+earlier partitions, so the dataset never holds a row twice.
+
+    python -m database.export --out exports/
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+from datetime import datetime, timezone
+
+from database.db import DB_NAME
+from utils.file_lock import FileLock
+
+EXPORT_DIR = os.getenv("EXPORT_DIR", "exports")
+BATCH_ROWS = 50_000
+ROWS_PER_FILE = 1_000_000
+
+# Exported tables and their columns as (name, Arrow type name)
+EXPORT_TABLES = {
+    "projects": [("id", "int64"), ("repo_url", "string"), ("repo_path", "string"), ("created_at", "string")],
+    "features": [("id", "int64"), ("project_id", "int64"), ("feature", "string")],
+    "tech_stack": [("id", "int64"), ("project_id", "int64"), ("stack_item", "string")],
+    "ideated_features": [("id", "int64"), ("project_id", "int64"), ("ideas", "string")],
+    "ideated_tech_stack": [
+        ("id", "int64"), ("project_id", "int64"), ("suggested_tech_stack_text", "string"), ("created_at", "string"),
+    ],
+}
+
+def _watermarks_path(out_dir):
+    return os.path.join(out_dir, "_watermarks.json")
+
+def load_watermarks(out_dir=EXPORT_DIR):
+    try:
+        with open(_watermarks_path(out_dir), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def _save_watermarks(out_dir, watermarks):
+    path = _watermarks_path(out_dir)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(watermarks, f, indent=2)
+    os.replace(tmp_path, path)
+
+def _swap_in(staging_dir, table_dir):
+    """Replace `table_dir` with `staging_dir`; the old partitions are removed."""
+    old_dir = None
+    if os.path.exists(table_dir):
+        old_dir = staging_dir + ".old"
+        os.rename(table_dir, old_dir)
+    os.rename(staging_dir, table_dir)
+    if old_dir:
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+def _export_table(conn, table, partition_dir, after_id, batch_size, rows_per_file):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    columns = EXPORT_TABLES[table]
+    schema = pa.schema([(name, getattr(pa, type_name)()) for name, type_name in columns])
+    cursor = conn.execute(
+        f"SELECT {', '.join(name for name, _ in columns)} FROM {table} WHERE id > ? ORDER BY id",
+        (after_id,),
+    )
+
+    files = []
+    writer = None
+    rows_in_file = 0
+    total_rows = 0
+    last_id = after_id
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            batch = pa.RecordBatch.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)],
+                schema=schema,
+            )
+            if writer is None or rows_in_file >= rows_per_file:
+                if writer is not None:
+                    writer.close()
+                os.makedirs(partition_dir, exist_ok=True)
+                path = os.path.join(partition_dir, f"part-{len(files):05d}.parquet")
+                writer = pq.ParquetWriter(path, schema, compression="zstd")
+                files.append(path)
+                rows_in_file = 0
+            writer.write_batch(batch)
+            rows_in_file += len(rows)
+            total_rows += len(rows)
+            last_id = rows[-1][0]
+    finally:
+        if writer is not None:
+            writer.close()
+    return {"rows": total_rows, "files": files, "watermark": last_id}
+
+def export_to_parquet(out_dir=EXPORT_DIR, tables=None, full=False, batch_size=BATCH_ROWS,
+                      rows_per_file=ROWS_PER_FILE, db_name=None):
+    """
+    Export `tables` (default: all of EXPORT_TABLES) to Parquet under `out_dir`.
+    Returns {table: {"rows", "files", "watermark"}}. Watermarks advance only
+    after every table is written, so a failed run is simply repeated. With
+    `full`, each table's existing partitions are replaced once every table
+    has been written.
+    """
+    tables = list(tables or EXPORT_TABLES)
+    unknown = [t for t in tables if t not in EXPORT_TABLES]
+    if unknown:
+        raise ValueError(f"Unknown tables: {', '.join(unknown)}. Available: {', '.join(EXPORT_TABLES)}")
+
+    os.makedirs(out_dir, exist_ok=True)
+    export_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    summary = {}
+    with FileLock(os.path.join(out_dir, "_export.lock")):
+        watermarks = {} if full else load_watermarks(out_dir)
+        conn = sqlite3.connect(db_name or DB_NAME)
+        try:
+            # One read transaction, so every table is exported from the same snapshot
+            conn.execute("BEGIN")
+            for table in tables:
+                # A full export is staged under a dot directory, which dataset readers skip
+                table_dir = os.path.join(out_dir, f".{table}.{export_id}" if full else table)
+                os.makedirs(table_dir, exist_ok=True)
+                summary[table] = _export_table(
+                    conn, table, os.path.join(table_dir, f"export_id={export_id}"),
+                    watermarks.get(table, 0), batch_size, rows_per_file,
+                )
+            conn.rollback()
+        except BaseException:
+            if full:
+                for table in tables:
+                    shutil.rmtree(os.path.join(out_dir, f".{table}.{export_id}"), ignore_errors=True)
+            raise
+        finally:
+            conn.close()
+        if full:
+            for table in tables:
+                staging_dir = os.path.join(out_dir, f".{table}.{export_id}")
+                table_dir = os.path.join(out_dir, table)
+                _swap_in(staging_dir, table_dir)
+                summary[table]["files"] = [
+                    os.path.join(table_dir, os.path.relpath(path, staging_dir)) for path in summary[table]["files"]
+                ]
+        watermarks = {**load_watermarks(out_dir), **{t: s["watermark"] for t, s in summary.items()}}
+        _save_watermarks(out_dir, watermarks)
+    return summary
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export the extraction database to Parquet")
+    parser.add_argument("--out", default=EXPORT_DIR, help=f"output directory (default: {EXPORT_DIR})")
+    parser.add_argument("--tables", help=f"comma-separated subset of: {', '.join(EXPORT_TABLES)}")
+    parser.add_argument("--full", action="store_true", help="ignore watermarks and export every row")
+    parser.add_argument("--batch-size", type=int, default=BATCH_ROWS, help="rows per record batch")
+    parser.add_argument("--rows-per-file", type=int, default=ROWS_PER_FILE)
+    args = parser.parse_args()
+
+    result = export_to_parquet(
+        args.out,
+        tables=args.tables.split(",") if args.tables else None,
+        full=args.full,
+        batch_size=args.batch_size,
+        rows_per_file=args.rows_per_file,
+    )
+    for table, info in result.items():
+        print(f"[INFO] {table}: {info['rows']} rows in {len(info['files'])} file(s), watermark {info['watermark']}")
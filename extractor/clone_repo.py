@@ -1,7 +1,18 @@
 import os
+import shutil
+import signal
 import subprocess
+import tempfile
+import time
 
-def clone_repo(repo_url, destination="cloned_repos", clone_type="readme"):
+from utils.deadline import DeadlineExceeded
+from utils.file_lock import FileLock, LockTimeout
+
+CLONE_DIR = os.getenv("CLONE_DIR", "cloned_repos")
+# Timeout for one clone, in seconds
+CLONE_TIMEOUT_SECONDS = float(os.getenv("CLONE_TIMEOUT_SECONDS", "300"))
+
+def clone_repo(repo_url, destination=CLONE_DIR, clone_type="readme", deadline=None, refresh=False):
     """
     Clones a Git repository.
 
@@ -12,43 +23,103 @@ def clone_repo(repo_url, destination="cloned_repos", clone_type="readme"):
         clone_type (str): Specifies what to clone. 
                           - "readme": Clones only the readme.md file (default).
                           - "full": Clones the complete repository.
+        deadline (Deadline): Optional; git is killed once it (or
+                             CLONE_TIMEOUT_SECONDS) runs out.
+        refresh (bool): Clone again and replace an existing clone.
     Returns:
         str or None: The path to the cloned repository or None if cloning fails.
+
+    The clone is built in a temporary directory next to its final location and
+    renamed into place once complete, so concurrent workers never see a
+    partial clone. A per-repository lock makes other workers wait for an
+    in-progress clone instead of cloning the same repository again.
     """
-    if not os.path.exists(destination):
-        os.makedirs(destination)
+    os.makedirs(destination, exist_ok=True)
 
     repo_name = repo_url.rstrip("/").split("/")[-1]
     local_path = os.path.join(destination, repo_name)
 
-    if os.path.exists(local_path):
+    if os.path.exists(local_path) and not refresh:
         print(f"[INFO] Repo already cloned at {local_path}")
         return local_path
 
+    # Wait for another worker's clone of the same repository only while the deadline allows
+    lock = FileLock(os.path.join(destination, f".{repo_name}.lock"), timeout=deadline.remaining() if deadline else None)
+    try:
+        with lock:
+            if os.path.exists(local_path) and not refresh:
+                print(f"[INFO] Repo already cloned at {local_path}")
+                return local_path
+
+            tmp_path = tempfile.mkdtemp(prefix=f".{repo_name}.", suffix=".tmp", dir=destination)
+            try:
+                timeout = deadline.timeout(CLONE_TIMEOUT_SECONDS) if deadline else CLONE_TIMEOUT_SECONDS
+                if not _clone_into(repo_url, tmp_path, clone_type, timeout):
+                    return None
+                if os.path.exists(local_path):
+                    # Swap the fresh clone in; the old one is removed once out of the way
+                    old_path = tmp_path + ".old"
+                    os.rename(local_path, old_path)
+                    os.rename(tmp_path, local_path)
+                    shutil.rmtree(old_path, ignore_errors=True)
+                else:
+                    os.rename(tmp_path, local_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    shutil.rmtree(tmp_path, ignore_errors=True)
+    except LockTimeout as e:
+        raise DeadlineExceeded(f"Deadline exceeded waiting for another clone of {repo_url}") from e
+    print(f"[SUCCESS] Published clone at {local_path}")
+    return local_path
+
+def _run_git(args, deadline_at, cwd=None):
+    """
+    Run a git command, killing it and every helper it spawned (remote
+    transports, index-pack) if it is still running at `deadline_at`.
+    """
+    timeout = None if deadline_at is None else max(0.0, deadline_at - time.monotonic())
+    # Never block on a credential prompt for a missing or private repository
+    env = dict(os.environ, GIT_TERMINAL_PROMPT="0")
+    proc = subprocess.Popen(["git", *args], cwd=cwd, env=env, start_new_session=True)
+    try:
+        returncode = proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        os.killpg(proc.pid, signal.SIGKILL)
+        proc.wait()
+        raise
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, ["git", *args])
+
+def _clone_into(repo_url, local_path, clone_type, timeout=None):
+    """Clone `repo_url` into the existing, empty directory `local_path` within `timeout` seconds."""
+    deadline_at = None if timeout is None else time.monotonic() + timeout
     try:
         if clone_type == "readme":
             print(f"[INFO] Cloning only readme.md from {repo_url} to {local_path}")
             # Initialize an empty repository
-            subprocess.run(["git", "init", local_path], check=True)
+            _run_git(["init", local_path], deadline_at)
             # Add the remote
-            subprocess.run(["git", "remote", "add", "origin", repo_url], cwd=local_path, check=True)
+            _run_git(["remote", "add", "origin", repo_url], deadline_at, cwd=local_path)
             # Enable sparse-checkout
-            subprocess.run(["git", "config", "core.sparseCheckout", "true"], cwd=local_path, check=True)
+            _run_git(["config", "core.sparseCheckout", "true"], deadline_at, cwd=local_path)
             # Define what to checkout
             sparse_checkout_path = os.path.join(local_path, ".git", "info", "sparse-checkout")
             with open(sparse_checkout_path, "w") as f:
                 f.write("readme.md\n")
             # Pull only the specified file
-            subprocess.run(["git", "pull", "--depth=1", "origin", "main" if "github.com" in repo_url else "master"], cwd=local_path, check=True)
-            print(f"[SUCCESS] Cloned readme.md to {local_path}")
+            _run_git(["pull", "--depth=1", "origin", "main" if "github.com" in repo_url else "master"], deadline_at, cwd=local_path)
+            print(f"[SUCCESS] Cloned readme.md from {repo_url}")
         elif clone_type == "full":
             print(f"[INFO] Cloning full repo from {repo_url} to {local_path}")
-            subprocess.run(["git", "clone", repo_url, local_path], check=True)
-            print(f"[SUCCESS] Cloned full repo to {local_path}")
+            _run_git(["clone", repo_url, local_path], deadline_at)
+            print(f"[SUCCESS] Cloned full repo from {repo_url}")
         else:
             print(f"[ERROR] Invalid clone_type '{clone_type}'. Use 'readme' or 'full'.")
-            return None
-        return local_path
+            return False
+        return True
     except subprocess.CalledProcessError as e:
         print(f"[ERROR] Cloning failed: {e}")
-        return None
\ No newline at end of file
+        return False
+    except subprocess.TimeoutExpired:
+        print(f"[ERROR] Cloning {repo_url} timed out after {timeout:.1f}s; git was killed")
+        return False
\ No newline at end of file
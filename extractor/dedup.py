@@ -0,0 +1,181 @@
+# extractor/dedup.py
+"""
+Drop redundant file content before it is sent to the LLM.
+
+Every file `parse_repo` found is still listed (so the model still sees the
+repository layout), but the content of these files is replaced by a one-line
+note:
+
+* generated files (protobuf/OpenAPI clients, minified bundles, lock files, ...)
+* exact duplicates of an earlier file (same normalized content hash)
+* near-duplicates of an earlier file (Jaccard similarity of line shingles)
+
+Header comment blocks (license banners and the like) of source files repeated
+across several files are kept in the first file only. Generated-file markers
+are only looked for in that leading comment block.
+"""
+
+import hashlib
+import re
+import zlib
+
+from utils.helpers import estimate_tokens
+
+NEAR_DUPLICATE_THRESHOLD = 0.85
+SHINGLE_LINES = 4
+HEADER_MIN_FILES = 3
+HEADER_MIN_LINES = 3
+
+GENERATED_SUFFIXES = (
+    "_pb2.py", "_pb2_grpc.py", "_pb.js", "_pb.d.ts", "_grpc_pb.js",
+    ".min.js", ".min.css", ".bundle.js", ".chunk.js",
+    "package-lock.json", "yarn.lock", "pnpm-lock.yaml", "poetry.lock",
+)
+# Markers generators write into the file's leading comment block; prose such as
+# "the id is auto-generated" further down a hand-written file does not count
+_GENERATED_MARKER_RX = re.compile(
+    r"@generated\b|\bcode generated\b.*\bdo not edit\b|generated by the protocol buffer compiler"
+    r"|\bgenerated by (?:the )?openapi generator\b",
+    flags=re.IGNORECASE,
+)
+# Files whose leading `#`, `//`, `/* */` or `<!-- -->` lines are comments; in
+# Markdown or plain text the same lines are headings and list items
+SOURCE_EXTENSIONS = (
+    ".py", ".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx", ".css", ".scss", ".html",
+    ".go", ".rs", ".java", ".kt", ".c", ".h", ".cc", ".cpp", ".hpp", ".cs", ".swift",
+    ".rb", ".php", ".sh", ".yaml", ".yml", ".toml",
+)
+_COMMENT_LINE_RX = re.compile(r"^\s*(?:#|//|/\*|\*|\*/|<!--|-->|$)")
+
+def _normalized_lines(content):
+    return [ln.strip() for ln in content.splitlines() if ln.strip()]
+
+def _content_hash(content):
+    return hashlib.sha256("\n".join(_normalized_lines(content)).encode("utf-8")).hexdigest()
+
+def _shingles(content):
+    lines = _normalized_lines(content)
+    return {
+        zlib.crc32("\n".join(lines[i : i + SHINGLE_LINES]).encode("utf-8"))
+        for i in range(len(lines) - SHINGLE_LINES + 1)
+    }
+
+def _is_source_file(path):
+    return path.lower().endswith(SOURCE_EXTENSIONS)
+
+def _leading_comments(content):
+    """Leading run of comment/blank lines (shebangs and encoding lines included)."""
+    lines = content.splitlines(keepends=True)
+    end = 0
+    while end < len(lines) and _COMMENT_LINE_RX.match(lines[end]):
+        end += 1
+    return "".join(lines[:end])
+
+def _header_block(path, content):
+    """The leading comment block of a source file, if long enough to be a banner."""
+    if not _is_source_file(path):
+        return ""
+    header = _leading_comments(content)
+    if len(_normalized_lines(header)) < HEADER_MIN_LINES:
+        return ""
+    return header
+
+def is_generated(path, content):
+    if path.lower().endswith(GENERATED_SUFFIXES):
+        return True
+    if not _is_source_file(path):
+        return False
+    return bool(_GENERATED_MARKER_RX.search(_leading_comments(content)))
+
+def dedup_repo_data(repo_data, near_threshold=NEAR_DUPLICATE_THRESHOLD):
+    """
+    Return `(deduped_repo_data, stats)`. The input is not modified; the output
+    lists the same files in the same order.
+    """
+    files = repo_data["files"]
+    stats = {
+        "files": len(files),
+        "generated": 0,
+        "exact_duplicates": 0,
+        "near_duplicates": 0,
+        "headers_stripped": 0,
+    }
+
+    # Header blocks shared by enough files are kept only where first seen
+    header_counts = {}
+    headers = []
+    for f in files:
+        header = _header_block(f["path"], f["content"])
+        headers.append(header)
+        if header:
+            key = _content_hash(header)
+            header_counts[key] = header_counts.get(key, 0) + 1
+    seen_headers = set()
+
+    seen_hashes = {}        # content hash -> path
+    shingle_index = {}      # shingle -> indexes into `kept`
+    kept = []               # (path, shingle set) of files kept in full
+    out_files = []
+
+    for f, header in zip(files, headers):
+        path, content = f["path"], f["content"]
+
+        if is_generated(path, content):
+            stats["generated"] += 1
+            out_files.append({"path": path, "content": "[skipped: generated file]"})
+            continue
+
+        # Duplicates are judged on the body, without a shared header
+        body = content
+        if header:
+            key = _content_hash(header)
+            if header_counts[key] >= HEADER_MIN_FILES:
+                body = content[len(header):]
+                if key in seen_headers:
+                    content = body
+                    stats["headers_stripped"] += 1
+                seen_headers.add(key)
+
+        if not body.strip():
+            out_files.append({"path": path, "content": content})
+            continue
+
+        digest = _content_hash(body)
+        if digest in seen_hashes:
+            stats["exact_duplicates"] += 1
+            out_files.append({"path": path, "content": f"[skipped: same content as {seen_hashes[digest]}]"})
+            continue
+        seen_hashes[digest] = path
+
+        shingles = _shingles(body)
+        if shingles:
+            overlaps = {}
+            for sh in shingles:
+                for idx in shingle_index.get(sh, ()):
+                    overlaps[idx] = overlaps.get(idx, 0) + 1
+            best_path = None
+            for idx, shared in overlaps.items():
+                other_path, other_shingles = kept[idx]
+                if shared / (len(shingles) + len(other_shingles) - shared) >= near_threshold:
+                    best_path = other_path
+                    break
+            if best_path:
+                stats["near_duplicates"] += 1
+                out_files.append({"path": path, "content": f"[skipped: near-duplicate of {best_path}]"})
+                continue
+            for sh in shingles:
+                shingle_index.setdefault(sh, []).append(len(kept))
+            kept.append((path, shingles))
+
+        out_files.append({"path": path, "content": content})
+
+    bytes_before = sum(len(f["content"].encode("utf-8")) for f in files)
+    bytes_after = sum(len(f["content"].encode("utf-8")) for f in out_files)
+    tokens_before = sum(estimate_tokens(f["content"]) for f in files)
+    tokens_after = sum(estimate_tokens(f["content"]) for f in out_files)
+    stats.update(
+        bytes_before=bytes_before,
+        bytes_saved=bytes_before - bytes_after,
+        tokens_saved=tokens_before - tokens_after,
+    )
+    return {**repo_data, "files": out_files}, stats
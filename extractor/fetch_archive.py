@@ -0,0 +1,88 @@
+# extractor/fetch_archive.py
+"""
+Fetch backend that downloads a repository archive over HTTP and parses it
+as a stream, without a git working tree. Entries are filtered by name and
+size from their tar headers, and only wanted files are read (into memory);
+nothing is written to disk. Produces the same dict as `parse_repo`.
+
+Selected with FETCH_BACKEND=archive (default: git, i.e. clone_repo + parse_repo).
+"""
+
+import os
+import tarfile
+from urllib.parse import urlparse
+
+import requests
+import urllib3
+
+from extractor.parse_repo import add_file, is_readme, new_repo_data, wants_file
+from utils.deadline import Deadline, DeadlineExceeded
+
+FETCH_BACKEND = os.getenv("FETCH_BACKEND", "git")
+FETCH_BACKENDS = ("git", "archive")
+# Formatted with {url} (the repository URL without ".git"), {owner} and {repo}.
+# GitHub redirects HEAD to the default branch.
+ARCHIVE_URL_TEMPLATE = os.getenv("ARCHIVE_URL_TEMPLATE", "{url}/archive/HEAD.tar.gz")
+# Timeout for one archive download, in seconds
+ARCHIVE_TIMEOUT_SECONDS = float(os.getenv("ARCHIVE_TIMEOUT_SECONDS", "300"))
+# Connect timeout and the longest wait for the next block of the response
+ARCHIVE_CONNECT_TIMEOUT = 10
+ARCHIVE_READ_TIMEOUT = 30
+
+def archive_url(repo_url):
+    url = repo_url.rstrip("/")
+    if url.endswith(".git"):
+        url = url[:-4]
+    parts = urlparse(url).path.strip("/").split("/")
+    owner, repo = (parts[-2] if len(parts) > 1 else ""), parts[-1]
+    return ARCHIVE_URL_TEMPLATE.format(url=url, owner=owner, repo=repo)
+
+def _strip_top_dir(name):
+    # Archives wrap everything in one directory such as "repo-<sha>/"
+    _, sep, rest = name.partition("/")
+    return rest if sep else name
+
+def fetch_archive(repo_url, clone_type="full", deadline=None):
+    """
+    Download and parse the archive of `repo_url`. With clone_type "readme"
+    only README files are kept, matching what the sparse git checkout reads.
+    Returns the repo_data dict, or None if the download fails.
+    Raises DeadlineExceeded if `deadline` (or ARCHIVE_TIMEOUT_SECONDS) runs
+    out mid-download.
+    """
+    url = archive_url(repo_url)
+    deadline = deadline.budget(cap=ARCHIVE_TIMEOUT_SECONDS) if deadline else Deadline(ARCHIVE_TIMEOUT_SECONDS)
+    deadline.check("archive download")
+    timeout = deadline.remaining()
+    print(f"[INFO] Streaming archive {url}")
+    repo_data = new_repo_data(repo_url)
+    try:
+        with requests.get(
+            url,
+            stream=True,
+            timeout=(min(ARCHIVE_CONNECT_TIMEOUT, timeout), min(ARCHIVE_READ_TIMEOUT, timeout)),
+        ) as resp:
+            resp.raise_for_status()
+            # "r|*": sequential read with transparent decompression, no seeking.
+            # resp.raw bypasses requests' error wrapping: a read timeout or a
+            # dropped connection mid-stream raises a urllib3 error
+            with tarfile.open(fileobj=resp.raw, mode="r|*") as tar:
+                for member in tar:
+                    if deadline.expired():
+                        raise DeadlineExceeded(f"Deadline exceeded while streaming {url}")
+                    if not member.isfile():
+                        continue
+                    rel_path = _strip_top_dir(member.name)
+                    filename = os.path.basename(rel_path)
+                    if clone_type == "readme" and not is_readme(filename):
+                        continue
+                    if not wants_file(filename, member.size):
+                        continue
+                    content = tar.extractfile(member).read().decode("utf-8", errors="ignore")
+                    # Same newline handling as reading the file in text mode
+                    add_file(repo_data, rel_path, content.replace("\r\n", "\n").replace("\r", "\n"))
+    except (requests.RequestException, urllib3.exceptions.HTTPError, tarfile.TarError) as e:
+        print(f"[ERROR] Fetching archive {url} failed: {e}")
+        return None
+    print(f"[SUCCESS] Parsed {len(repo_data['files'])} files from {url}")
+    return repo_data
@@ -4,40 +4,52 @@ import os
 
 # Define file types you care about
 TEXT_EXTENSIONS = [".md", ".py", ".js", ".ts", ".html", ".css", ".json", ".txt"]
+# Larger files are skipped (bundles, data dumps); they cost tokens without describing the project
+MAX_FILE_BYTES = int(os.getenv("MAX_FILE_BYTES", "1000000"))
+SKIP_DIRS = {".git"}
 
 def is_text_file(filename):
     return any(filename.endswith(ext) for ext in TEXT_EXTENSIONS)
 
-def parse_repo(repo_path):
-    repo_data = {
+def is_readme(filename):
+    return filename.lower() == "readme.md"
+
+def wants_file(filename, size):
+    """Whether a file is read at all; decided from its name and size before opening it."""
+    return (is_readme(filename) or is_text_file(filename)) and size <= MAX_FILE_BYTES
+
+def new_repo_data(repo_path):
+    return {
         "repo_path": repo_path,
         "readme": "",
         "files": []  # List of dicts: { "path": ..., "content": ... }
     }
 
-    for root, _, files in os.walk(repo_path):
+def add_file(repo_data, rel_path, content):
+    """Record one file read from a repository (working tree or archive)."""
+    if is_readme(os.path.basename(rel_path)):
+        repo_data["readme"] = content
+    else:
+        repo_data["files"].append({
+            "path": rel_path,
+            "content": content
+        })
+
+def parse_repo(repo_path):
+    repo_data = new_repo_data(repo_path)
+
+    for root, dirs, files in os.walk(repo_path):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
         for file in files:
             full_path = os.path.join(root, file)
             rel_path = os.path.relpath(full_path, repo_path)
 
-            # Readme extraction
-            if file.lower() == "readme.md":
-                try:
-                    with open(full_path, "r", encoding="utf-8", errors="ignore") as f:
-                        repo_data["readme"] = f.read()
-                except Exception as e:
-                    print(f"[ERROR] Reading README: {e}")
-
-            # Text/code file extraction
-            elif is_text_file(file):
-                try:
-                    with open(full_path, "r", encoding="utf-8", errors="ignore") as f:
-                        content = f.read()
-                        repo_data["files"].append({
-                            "path": rel_path,
-                            "content": content
-                        })
-                except Exception as e:
-                    print(f"[ERROR] Reading file {rel_path}: {e}")
+            try:
+                if not wants_file(file, os.path.getsize(full_path)):
+                    continue
+                with open(full_path, "r", encoding="utf-8", errors="ignore") as f:
+                    add_file(repo_data, rel_path, f.read())
+            except Exception as e:
+                print(f"[ERROR] Reading file {rel_path}: {e}")
 
     return repo_data
@@ -0,0 +1,162 @@
+# extractor/skeleton.py
+"""
+Code skeletons: what a file declares, without the function bodies.
+
+Feature extraction only needs to know what a project exposes, so Python
+files are reduced (via `ast`) to imports, class and function signatures,
+decorators (routes, CLI commands, ...), docstrings and module-level wiring.
+JS/TS files get a line-based equivalent. Everything else passes through,
+except markup and stylesheets which are truncated.
+"""
+
+import ast
+import re
+
+DOCSTRING_CHARS = 300
+STATEMENT_CHARS = 160
+MARKUP_CHARS = 2_000
+
+PYTHON_EXTENSIONS = (".py",)
+JS_EXTENSIONS = (".js", ".jsx", ".ts", ".tsx", ".mjs", ".cjs")
+MARKUP_EXTENSIONS = (".html", ".css")
+
+###############################################################################
+# Python
+###############################################################################
+def _docstring(node, indent):
+    doc = ast.get_docstring(node)
+    if not doc:
+        return []
+    doc = doc.strip().split("\n\n", 1)[0]
+    if len(doc) > DOCSTRING_CHARS:
+        doc = doc[:DOCSTRING_CHARS].rstrip() + "…"
+    return [f'{indent}"""{doc}"""']
+
+def _short(code):
+    code = " ".join(code.split())
+    return code if len(code) <= STATEMENT_CHARS else code[:STATEMENT_CHARS] + " …"
+
+def _emit_python(node, indent, out):
+    pad = "    " * indent
+    if isinstance(node, (ast.Import, ast.ImportFrom)):
+        out.append(pad + ast.unparse(node))
+    elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        for dec in node.decorator_list:
+            out.append(f"{pad}@{_short(ast.unparse(dec))}")
+        prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+        returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+        out.append(f"{pad}{prefix} {node.name}({_short(ast.unparse(node.args))}){returns}:")
+        out.extend(_docstring(node, pad + "    "))
+        out.append(pad + "    ...")
+    elif isinstance(node, ast.ClassDef):
+        for dec in node.decorator_list:
+            out.append(f"{pad}@{_short(ast.unparse(dec))}")
+        bases = [ast.unparse(b) for b in node.bases] + [ast.unparse(k) for k in node.keywords]
+        out.append(f"{pad}class {node.name}({', '.join(bases)}):" if bases else f"{pad}class {node.name}:")
+        out.extend(_docstring(node, pad + "    "))
+        before = len(out)
+        for child in node.body:
+            if isinstance(child, ast.AnnAssign):
+                # dataclass / pydantic / ORM fields
+                out.append(pad + "    " + _short(ast.unparse(child)))
+            else:
+                _emit_python(child, indent + 1, out)
+        if len(out) == before:
+            out.append(pad + "    ...")
+    elif indent == 0 and isinstance(node, (ast.Assign, ast.AnnAssign, ast.Expr)):
+        # Module-level wiring: `app = FastAPI(...)`, `router.add_api_route(...)`, constants
+        value = node.value
+        if isinstance(value, ast.Call) or (
+            isinstance(node, ast.Assign)
+            and all(isinstance(t, ast.Name) and t.id.isupper() for t in node.targets)
+        ):
+            out.append(_short(ast.unparse(node)))
+    elif indent == 0 and isinstance(node, ast.If) and "__main__" in ast.unparse(node.test):
+        out.append(f"if {ast.unparse(node.test)}:")
+        for child in node.body:
+            if isinstance(child, ast.Expr) and isinstance(child.value, ast.Call):
+                out.append("    " + _short(ast.unparse(child)))
+
+def skeletonize_python(source):
+    """Skeleton of a Python module; the source is returned unchanged if it doesn't parse."""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return source
+    out = _docstring(tree, "")
+    for node in tree.body:
+        _emit_python(node, 0, out)
+    return "\n".join(out) + "\n"
+
+###############################################################################
+# JavaScript / TypeScript
+###############################################################################
+_JS_KEEP_RXS = [
+    re.compile(r"^\s*(?:import|export)\b"),
+    re.compile(r"^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?function\b"),
+    re.compile(r"^\s*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?class\b"),
+    re.compile(r"^\s*(?:export\s+)?(?:declare\s+)?(?:interface|type|enum)\s+\w+"),
+    re.compile(r"^\s*(?:export\s+)?(?:const|let|var)\s+\w+\s*(?::[^=]+)?=\s*(?:async\s+)?(?:\([^)]*\)|\w+)\s*(?::[^=]+)?=>"),
+    re.compile(r"^\s*(?:export\s+)?(?:const|let|var)\s+\w+\s*=\s*(?:require|express|createApp|new\s+\w+)\b"),
+    re.compile(r"\b(?:app|router|server|api)\.(?:get|post|put|patch|delete|use|route|all)\s*\("),
+    re.compile(r"^\s*@\w+"),
+    re.compile(
+        r"^\s+(?:(?:public|private|protected|static|readonly|async|get|set)\s+)*"
+        r"(?!(?:if|for|while|switch|catch|return|function)\b)\w+\s*\([^;]*\)\s*(?::\s*[^{;=]+)?\{\s*$"
+    ),
+]
+
+def _strip_body(line):
+    line = line.rstrip()
+    # Keep `foo(a, b) {` → `foo(a, b)`, but leave object/import braces alone
+    if line.endswith("{") and not re.match(r"^\s*(?:import|export)\s*\{", line):
+        line = line[:-1].rstrip()
+    return _short(line) if len(line) > STATEMENT_CHARS else line
+
+def skeletonize_js(source):
+    """Skeleton of a JS/TS module: imports/exports, declarations, routes and JSDoc summaries."""
+    out = []
+    doc_lines = None      # lines of the JSDoc block being read
+    pending_doc = None    # summary of the last JSDoc block, attached to the next kept line
+    for line in source.splitlines():
+        stripped = line.strip()
+        if doc_lines is None and stripped.startswith("/**"):
+            doc_lines = []
+        if doc_lines is not None:
+            doc_lines.append(stripped.strip("/* "))
+            if "*/" in stripped:
+                summary = " ".join(l for l in doc_lines if l and not l.startswith("@")).strip()
+                pending_doc = summary.split(". ")[0][:DOCSTRING_CHARS] or None
+                doc_lines = None
+            continue
+        if any(rx.search(line) for rx in _JS_KEEP_RXS):
+            if pending_doc:
+                out.append(f"{_leading_ws(line)}/** {pending_doc} */")
+            out.append(_strip_body(line))
+            pending_doc = None
+        elif stripped and not stripped.startswith("//"):
+            pending_doc = None
+    return "\n".join(out) + "\n"
+
+def _leading_ws(line):
+    return line[: len(line) - len(line.lstrip())]
+
+###############################################################################
+# Repository
+###############################################################################
+def skeletonize_file(path, content):
+    lower = path.lower()
+    if lower.endswith(PYTHON_EXTENSIONS):
+        return skeletonize_python(content)
+    if lower.endswith(JS_EXTENSIONS):
+        return skeletonize_js(content)
+    if lower.endswith(MARKUP_EXTENSIONS) and len(content) > MARKUP_CHARS:
+        return content[:MARKUP_CHARS] + "\n[... truncated]\n"
+    return content
+
+def skeletonize_repo_data(repo_data):
+    """Copy of `repo_data` with every file replaced by its skeleton."""
+    return {
+        **repo_data,
+        "files": [{"path": f["path"], "content": skeletonize_file(f["path"], f["content"])} for f in repo_data["files"]],
+    }
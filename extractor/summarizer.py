@@ -1,56 +1,203 @@
 # extractor/summarizer.py
 
 import os
-from dotenv import load_dotenv
-from groq import Groq
-from utils.helpers import chunk_text
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 
-load_dotenv()
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+from extractor.llm_backends import get_backend
+from extractor.skeleton import skeletonize_repo_data
+from utils.deadline import DeadlineExceeded
+from utils.helpers import chunk_text, estimate_tokens, parse_llm_summary
+from utils.profiler import profiled
 
-def summarize_with_llm(prompt: str, model: str = "llama-3.1-8b-instant"):
+# Per-phase model routing: a cheap, fast model for the per-chunk "map" calls and
+# a stronger one for the final "reduce" summary and the ideation prompts.
+MAP_MODEL = os.getenv("LLM_MAP_MODEL", "llama-3.1-8b-instant")
+REDUCE_MODEL = os.getenv("LLM_REDUCE_MODEL", "llama-3.3-70b-versatile")
+IDEATION_MODEL = os.getenv("LLM_IDEATION_MODEL", REDUCE_MODEL)
+
+# Chunks are mapped in concurrent batches of this size
+CHUNK_BATCH_SIZE = int(os.getenv("CHUNK_BATCH_SIZE", "4"))
+# Stop mapping after this many consecutive batches add no new feature or
+# tech-stack item (0 disables early termination)
+SATURATION_PATIENCE = int(os.getenv("SATURATION_PATIENCE", "0"))
+# What the map step sees of each source file: "raw" contents, or "skeleton"
+# (imports, signatures, decorators and docstrings only; see extractor/skeleton.py)
+SUMMARIZER_MODE = os.getenv("SUMMARIZER_MODE", "raw")
+SUMMARIZER_MODES = ("raw", "skeleton")
+# Timeout for one LLM call, in seconds
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+# Share of an extraction deadline given to the map step; the rest is kept for the reduce call
+MAP_BUDGET_FRACTION = 0.8
+
+# Process-wide count of LLM calls and (estimated) prompt tokens, e.g. for budgets
+_usage = {"calls": 0, "prompt_tokens": 0}
+_usage_lock = threading.Lock()
+
+def llm_usage():
+    with _usage_lock:
+        return dict(_usage)
+
+def summarize_with_llm(prompt: str, model: str = MAP_MODEL, deadline=None):
+    """
+    The model's answer, or "" if the call fails. Raises DeadlineExceeded if
+    `deadline` has passed, or runs out while the call is in flight.
+    """
+    timeout = deadline.timeout(LLM_TIMEOUT_SECONDS) if deadline else LLM_TIMEOUT_SECONDS
+    if timeout is not None and timeout <= 0:
+        raise DeadlineExceeded("Deadline exceeded before the LLM call")
+    with _usage_lock:
+        _usage["calls"] += 1
+        _usage["prompt_tokens"] += estimate_tokens(prompt)
     try:
-        response = client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model=model,
-        )
-        return response.choices[0].message.content
+        return get_backend().complete(prompt, model, timeout=timeout)
     except Exception as e:
+        if deadline and deadline.expired():
+            raise DeadlineExceeded(f"LLM call cut off by the deadline: {e}") from e
         print(f"[ERROR] LLM summarization failed: {e}")
         return ""
 
-def extract_features_and_techstack(repo_data):
-    combined_text = repo_data["readme"] + "\n\n"
+def _item_key(text):
+    return text.split(":", 1)[0].strip(" *_`").lower()
+
+def _map_prompt(idx, chunk):
+    return (
+        "Given the following project code and documentation, extract:\n"
+        "1. A list of features with descriptions.\n"
+        "2. The tech stack used in the project.\n\n"
+        f"### INPUT CHUNK {idx+1} ###\n{chunk}\n"
+    )
+
+def build_prompt_input(repo_data):
+    """The README followed by every file, as sent (in chunks) to the map step."""
+    parts = [repo_data["readme"], ""]
     for file in repo_data["files"]:
-        combined_text += f"# File: {file['path']}\n{file['content']}\n\n"
+        parts.append(f"# File: {file['path']}\n{file['content']}\n")
+    return "\n".join(parts)
+
+def extract_features_and_techstack(repo_data, mode=None, deadline=None):
+    summary, _ = extract_features_and_techstack_with_stats(repo_data, mode=mode, deadline=deadline)
+    return summary
 
+def extract_features_and_techstack_with_stats(repo_data, patience=None, batch_size=None, mode=None, deadline=None):
+    """
+    Map every chunk of the repository through MAP_MODEL, then reduce the
+    chunk outputs with REDUCE_MODEL. Returns `(final_summary, stats)`.
+
+    `mode` (default: SUMMARIZER_MODE) selects raw file contents or code skeletons.
+
+    With `patience` > 0 (default: SATURATION_PATIENCE) mapping stops once
+    that many consecutive batches discover no new feature or tech-stack item;
+    `stats` reports the chunks skipped and an estimate of the latency saved.
+
+    With a `deadline` (utils.deadline.Deadline) the map step stops when its
+    share of the time is used up: LLM calls still queued are cancelled and
+    the reduce step summarizes the chunks mapped so far (`stats["deadline_hit"]`).
+    Raises DeadlineExceeded if not a single chunk was mapped in time, or
+    if the deadline runs out during the reduce call.
+    """
+    patience = SATURATION_PATIENCE if patience is None else patience
+    batch_size = max(1, batch_size or CHUNK_BATCH_SIZE)
+    mode = mode or SUMMARIZER_MODE
+    if mode not in SUMMARIZER_MODES:
+        raise ValueError(f"Invalid summarizer mode '{mode}'. Use one of: {', '.join(SUMMARIZER_MODES)}")
+    started = time.perf_counter()
+
+    if mode == "skeleton":
+        repo_data = skeletonize_repo_data(repo_data)
+    combined_text = build_prompt_input(repo_data)
     chunks = chunk_text(combined_text, max_length=3000)
 
     all_features = []
-    all_tech_stack = []
+    seen_items = set()
+    stale_batches = 0
+    batch_times = []
+    processed = 0
+    deadline_hit = False
+    map_deadline = deadline.budget(MAP_BUDGET_FRACTION) if deadline else None
+
+    pool = ThreadPoolExecutor(max_workers=batch_size)
+    try:
+        for batch_start in range(0, len(chunks), batch_size):
+            if map_deadline and map_deadline.expired():
+                deadline_hit = True
+                break
+            batch = list(enumerate(chunks[batch_start : batch_start + batch_size], start=batch_start))
+            batch_started = time.perf_counter()
+            futures = [
+                pool.submit(profiled(summarize_with_llm), _map_prompt(idx, chunk), MAP_MODEL, map_deadline)
+                for idx, chunk in batch
+            ]
+            _, pending = wait(futures, timeout=map_deadline.remaining() if map_deadline else None)
+            if pending:
+                # Out of time: drop calls that have not started and keep what finished
+                for future in pending:
+                    future.cancel()
+                deadline_hit = True
+            batch_times.append(time.perf_counter() - batch_started)
+            finished = []
+            for item, future in zip(batch, futures):
+                if not future.done() or future.cancelled():
+                    continue
+                if isinstance(future.exception(), DeadlineExceeded):
+                    deadline_hit = True
+                    continue
+                # A failed call returns ""; it does not count as mapped
+                if future.result():
+                    finished.append((item, future.result()))
+            processed += len(finished)
 
-    for idx, chunk in enumerate(chunks):
-        prompt = (
-            "Given the following project code and documentation, extract:\n"
-            "1. A list of features with descriptions.\n"
-            "2. The tech stack used in the project.\n\n"
-            f"### INPUT CHUNK {idx+1} ###\n{chunk}\n"
-        )
+            new_items = 0
+            for (idx, _), summary in finished:
+                all_features.append(f"Chunk {idx+1}:\n" + summary)
+                features, tech_stack = parse_llm_summary(summary)
+                for key in {("f", _item_key(x)) for x in features} | {("t", _item_key(x)) for x in tech_stack}:
+                    if key not in seen_items:
+                        seen_items.add(key)
+                        new_items += 1
 
-        summary = summarize_with_llm(prompt)
-        all_features.append(f"Chunk {idx+1}:\n" + summary)
+            if deadline_hit:
+                print(f"[WARN] Deadline reached after {processed}/{len(chunks)} chunks; skipping the rest")
+                break
+            stale_batches = 0 if new_items else stale_batches + 1
+            if patience and stale_batches >= patience and processed < len(chunks):
+                print(f"[INFO] Saturated after {processed}/{len(chunks)} chunks; skipping the rest")
+                break
+    finally:
+        # Do not wait for calls still running past the deadline; their own timeouts end them
+        pool.shutdown(wait=not deadline_hit, cancel_futures=True)
 
+    if chunks and not processed and deadline_hit:
+        raise DeadlineExceeded("Deadline exceeded before any chunk was summarized")
+
+    chunk_outputs = "\n".join(all_features)
     final_prompt = (
         "Summarize all of the following LLM outputs into:\n"
         "1. Final list of major project features with brief descriptions.\n"
         "2. Final tech stack used (languages, libraries, tools, etc.)\n\n"
-        f"### INPUT ###\n{'\n'.join(all_features)}"
+        f"### INPUT ###\n{chunk_outputs}"
     )
 
-    final_summary = summarize_with_llm(final_prompt)
-    return final_summary
+    final_summary = summarize_with_llm(final_prompt, REDUCE_MODEL, deadline)
+
+    skipped = len(chunks) - processed
+    mean_batch = sum(batch_times) / len(batch_times) if batch_times else 0.0
+    stats = {
+        "mode": mode,
+        "input_tokens": estimate_tokens(combined_text),
+        "chunks_total": len(chunks),
+        "chunks_processed": processed,
+        "chunks_skipped": skipped,
+        "latency_saved_s": round(-(-skipped // batch_size) * mean_batch, 2),
+        "elapsed_s": round(time.perf_counter() - started, 2),
+        "deadline_hit": deadline_hit,
+        "map_model": MAP_MODEL,
+        "reduce_model": REDUCE_MODEL,
+    }
+    return final_summary, stats
 
-def suggest_new_features_from_features(existing_features_text):
+def suggest_new_features_from_features(existing_features_text, deadline=None):
     """
     Suggests new features based on a list of existing features from similar projects.
     """
@@ -60,9 +207,9 @@ def suggest_new_features_from_features(existing_features_text):
         f"{existing_features_text}\n\n"
         "### Suggested New Features with descriptions:"
     )
-    return summarize_with_llm(prompt)
+    return summarize_with_llm(prompt, IDEATION_MODEL, deadline)
 
-def suggest_new_tech_stack_from_tech_stack(existing_tech_stack_text: str, generated_features_text: str) -> str:
+def suggest_new_tech_stack_from_tech_stack(existing_tech_stack_text: str, generated_features_text: str, deadline=None) -> str:
     """
     Suggests new tech stack components based on a list of existing tech stacks
     and the generated features for a new project.
@@ -80,4 +227,4 @@ def suggest_new_tech_stack_from_tech_stack(existing_tech_stack_text: str, genera
         "Do NOT include any headings, introductory/concluding remarks, explanations, "
         "code blocks, or any other additional text. Just the tech stack items, one per line."
     )
-    return summarize_with_llm(prompt)
\ No newline at end of file
+    return summarize_with_llm(prompt, IDEATION_MODEL, deadline)
\ No newline at end of file
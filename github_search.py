@@ -1,21 +1,203 @@
 # github_search.py
 
-import requests
+import math
 import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import requests
+
+from utils.deadline import DeadlineExceeded
+from utils.disk_cache import DiskCache
+from utils.file_lock import LockTimeout
+from utils.helpers import load_env
+from utils.profiler import profiled
+
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+
+# Shared by all worker processes; identical searches within the TTL hit GitHub once
+SEARCH_CACHE_TTL_SECONDS = int(os.getenv("SEARCH_CACHE_TTL_SECONDS", "3600"))
+_search_cache = DiskCache("github_search", ttl_seconds=SEARCH_CACHE_TTL_SECONDS)
+
+# Candidates fetched per requested result, so filtering usually leaves enough;
+# otherwise further pages are fetched, up to MAX_PAGES
+OVERFETCH_FACTOR = 3
+MAX_PER_PAGE = 100
+MAX_PAGES = 5
+SEARCH_CONCURRENCY = 4
+# Timeout for one GitHub API call, in seconds
+GITHUB_TIMEOUT_SECONDS = float(os.getenv("GITHUB_TIMEOUT_SECONDS", "10"))
 
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+# Pre-clone filters (size is in KB, as reported by GitHub)
+DEFAULT_FILTERS = {
+    "max_size_kb": int(os.getenv("SEARCH_MAX_SIZE_KB", "200000")),
+    "max_inactive_days": int(os.getenv("SEARCH_MAX_INACTIVE_DAYS", str(3 * 365))),
+    "exclude_archived": True,
+    "exclude_related_forks": True,
+}
 
-def search_similar_repositories(query, max_results=5):
-    url = f"https://api.github.com/search/repositories"
-    params = {"q": query, "sort": "stars", "order": "desc", "per_page": max_results}
-    headers = {
-        "Authorization": f"token {GITHUB_TOKEN}",
+def _headers():
+    load_env()
+    return {
+        "Authorization": f"token {os.getenv('GITHUB_TOKEN')}",
         "Accept": "application/vnd.github.v3+json"
     }
 
-    resp = requests.get(url, headers=headers, params=params)
+def _candidate(item):
+    """Keep the metadata needed for filtering and ranking, not just name and URL."""
+    return {
+        "name": item["full_name"],
+        "url": item["html_url"],
+        "stars": item.get("stargazers_count", 0),
+        "size_kb": item.get("size", 0),
+        "language": item.get("language"),
+        "archived": item.get("archived", False),
+        "fork": item.get("fork", False),
+        "pushed_at": item.get("pushed_at"),
+        "default_branch": item.get("default_branch"),
+    }
+
+def _timeout(deadline):
+    if not deadline:
+        return GITHUB_TIMEOUT_SECONDS
+    timeout = deadline.timeout(GITHUB_TIMEOUT_SECONDS)
+    # requests rejects a zero timeout; an expired deadline ends the search instead
+    if timeout <= 0:
+        raise DeadlineExceeded("Deadline exceeded during GitHub search")
+    return timeout
+
+def _fetch_page(query, page, per_page, deadline=None):
+    url = f"{GITHUB_API_URL}/search/repositories"
+    params = {"q": query, "sort": "stars", "order": "desc", "per_page": per_page, "page": page}
+    resp = requests.get(url, headers=_headers(), params=params, timeout=_timeout(deadline))
+    if resp.status_code == 422:
+        # GitHub only serves the first 1000 results
+        return []
     resp.raise_for_status()
-    return [
-        {"name": item["full_name"], "url": item["html_url"]}
-        for item in resp.json().get("items", [])
-    ]
+    return [_candidate(item) for item in resp.json().get("items", [])]
+
+def _fork_source(name, deadline=None):
+    """Full name of the repository a fork was created from (its network root)."""
+    timeout = _timeout(deadline)
+    try:
+        resp = requests.get(f"{GITHUB_API_URL}/repos/{name}", headers=_headers(), timeout=timeout)
+    except requests.RequestException:
+        return None
+    if not resp.ok:
+        return None
+    data = resp.json()
+    return (data.get("source") or data.get("parent") or {}).get("full_name")
+
+def _fetch_pages(pool, query, pages, per_page, deadline):
+    """Candidates on the given result pages, in order, and whether the results ran out."""
+    results = list(pool.map(profiled(lambda page: _fetch_page(query, page, per_page, deadline)), pages))
+    return [cand for page in results for cand in page], any(len(page) < per_page for page in results)
+
+def search_repository_candidates(query, max_results, filters=None, deadline=None):
+    """
+    Page through the search results until `filter_and_rank` keeps
+    `max_results` candidates, the results run out or MAX_PAGES pages were
+    read. The first page is sized to over-fetch by OVERFETCH_FACTOR; when
+    filtering leaves too few, further pages are fetched concurrently.
+    Forks are annotated with `source`. Returns the ranked candidates.
+    """
+    per_page = min(MAX_PER_PAGE, max_results * OVERFETCH_FACTOR)
+    candidates = []
+    seen = set()
+    next_page = 1
+    with ThreadPoolExecutor(max_workers=SEARCH_CONCURRENCY) as pool:
+        while True:
+            # One page first; it is usually enough
+            batch = 1 if next_page == 1 else min(SEARCH_CONCURRENCY, MAX_PAGES - next_page + 1)
+            fetched, exhausted = _fetch_pages(pool, query, range(next_page, next_page + batch), per_page, deadline)
+            next_page += batch
+
+            new = [c for c in fetched if c["name"] not in seen]
+            seen.update(c["name"] for c in new)
+            forks = [c for c in new if c["fork"]]
+            for cand, source in zip(forks, pool.map(profiled(lambda c: _fork_source(c["name"], deadline)), forks)):
+                cand["source"] = source
+            candidates.extend(new)
+
+            ranked = filter_and_rank(candidates, max_results, filters)
+            if len(ranked) >= max_results or exhausted or next_page > MAX_PAGES:
+                return ranked
+
+def _days_since(timestamp, now):
+    if not timestamp:
+        return None
+    pushed = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    return (now - pushed).total_seconds() / 86400
+
+def filter_and_rank(candidates, max_results, filters=None, now=None):
+    """
+    Drop candidates that are not worth cloning, then rank the rest by stars
+    weighted by recent activity. Returns at most `max_results` candidates.
+    """
+    filters = {**DEFAULT_FILTERS, **(filters or {})}
+    now = now or datetime.now(timezone.utc)
+
+    passed = []
+    for cand in candidates:
+        if filters["exclude_archived"] and cand["archived"]:
+            continue
+        if filters["max_size_kb"] and cand["size_kb"] > filters["max_size_kb"]:
+            continue
+        inactive_days = _days_since(cand["pushed_at"], now)
+        if filters["max_inactive_days"] and inactive_days is not None and inactive_days > filters["max_inactive_days"]:
+            continue
+        passed.append((cand, inactive_days))
+
+    # A fork only stands in for its source if the source itself was dropped
+    names = {cand["name"] for cand, _ in passed}
+    kept = []
+    seen_sources = set()
+    for cand, inactive_days in passed:
+        if filters["exclude_related_forks"] and cand["fork"] and cand.get("source"):
+            # Skip forks of another kept candidate, and all but the first fork of the same source
+            if cand["source"] in names or cand["source"] in seen_sources:
+                continue
+            seen_sources.add(cand["source"])
+        cand = dict(cand)
+        recency = math.exp(-(inactive_days or 0) / 365)
+        cand["rank_score"] = round(math.log1p(cand["stars"]) * (0.5 + 0.5 * recency), 4)
+        kept.append(cand)
+
+    kept.sort(key=lambda c: c["rank_score"], reverse=True)
+    return kept[:max_results]
+
+def _cache_key(query, max_results, filters):
+    # GitHub search ignores case and extra spaces, so such variants share an entry
+    query = " ".join(query.lower().split())
+    return f"{query}\n{max_results}\n{sorted({**DEFAULT_FILTERS, **(filters or {})}.items())}"
+
+def search_cache_age(query, max_results=5, filters=None):
+    """Seconds since the results for these arguments were cached, or None."""
+    return _search_cache.age(_cache_key(query, max_results, filters))
+
+def search_similar_repositories(query, max_results=5, filters=None, deadline=None, refresh=False):
+    """
+    Repositories similar to `query` worth analysing: over-fetched across
+    result pages, filtered by metadata and ranked before anything is cloned.
+    Each result has `name` and `url` plus the metadata used for ranking.
+    Every API call is bounded by GITHUB_TIMEOUT_SECONDS and `deadline`;
+    raises DeadlineExceeded once `deadline` has passed and
+    requests.RequestException if GitHub fails or times out. Nothing is
+    cached then.
+    `refresh` searches again even if cached results are still valid.
+    """
+    filters = {**DEFAULT_FILTERS, **(filters or {})}
+    key = _cache_key(query, max_results, filters)
+
+    def search():
+        return search_repository_candidates(query, max_results, filters, deadline)
+
+    if refresh:
+        results = search()
+        _search_cache.set(key, results)
+        return results
+    try:
+        # Another worker may be running the same search; wait for it only while the deadline allows
+        return _search_cache.get_or_compute(key, search, timeout=deadline.remaining() if deadline else None)
+    except LockTimeout as e:
+        raise DeadlineExceeded(f"Deadline exceeded waiting for the same search in another worker: {e}") from e
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Compare two load-test reports written by `loadtest.run`.
+
+    python -m loadtest.compare before.json after.json
+
+Prints throughput, error rate and latency percentiles side by side with the
+relative change, overall, per endpoint and per /ideate stage.
+"""
+
+import argparse
+import json
+
+METRICS = ("throughput_rps", "error_rate", "p50_ms", "p95_ms", "p99_ms")
+
+
+def _change(old, new):
+    if old in (None, 0) or new is None:
+        return ""
+    return f"{(new - old) / old * 100:+.1f}%"
+
+
+def _rows(section, old, new, metrics):
+    rows = []
+    for metric in metrics:
+        a, b = old.get(metric), new.get(metric)
+        if a is None and b is None:
+            continue
+        rows.append((section, metric, a, b, _change(a, b)))
+    return rows
+
+
+def compare(old, new):
+    rows = _rows("overall", {**old, **old["latency"]}, {**new, **new["latency"]}, METRICS)
+    for name in sorted(set(old["endpoints"]) | set(new["endpoints"])):
+        rows += _rows(f"endpoint {name}", old["endpoints"].get(name, {}), new["endpoints"].get(name, {}), METRICS)
+    for name in sorted(set(old["stages"]) | set(new["stages"])):
+        rows += _rows(f"stage {name}", old["stages"].get(name, {}), new["stages"].get(name, {}), ("p50_ms", "p95_ms"))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        old = json.load(f)
+    with open(args.after) as f:
+        new = json.load(f)
+
+    print(f"{'':34} {old.get('label') or args.before:>14} {new.get('label') or args.after:>14}")
+    for section, metric, a, b, change in compare(old, new):
+        print(f"{section + ' ' + metric:34} {str(a):>14} {str(b):>14} {change:>9}")
+
+
+if __name__ == "__main__":
+    main()
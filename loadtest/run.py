@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Load generator for the FastAPI service, run entirely against local stand-ins.
+
+Starts a fake GitHub search API over local bare repositories (served over
+file:// or a local git daemon), starts `app.py` with the fake LLM backend,
+then drives it with a fixed number of concurrent clients and a weighted mix
+of requests. Writes a JSON report with throughput, latency percentiles and
+error rates per endpoint plus a per-stage breakdown of /ideate taken from
+its Server-Timing header. Compare two reports with `loadtest/compare.py`.
+
+    python -m loadtest.run --concurrency 8 --duration 60 \\
+        --mix ideate=2,status=1,health=1,analytics=1 \\
+        --llm-latency-ms 200 --llm-error-rate 0.02 --output report.json
+
+Pass --base-url to drive an already running server instead (stand-ins and
+server flags are then ignored).
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+import requests
+
+from loadtest.standins import FakeGitHub, GitDaemon, make_bare_repos, start_api
+from utils.timing import parse_server_timing
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+###############################################################################
+# Request mix
+###############################################################################
+def _ideate(session, base_url, client_id, n, args):
+    payload = {
+        "project_idea": f"load test idea {client_id} {n}" if args.unique_ideas else f"load test idea {n % 10}",
+        "max_repos": args.max_repos,
+        "use_local_index": not args.no_local_index,
+    }
+    return session.post(f"{base_url}/ideate", json=payload, timeout=args.timeout)
+
+def _status(session, base_url, client_id, n, args):
+    return session.get(f"{base_url}/status", timeout=args.timeout)
+
+def _health(session, base_url, client_id, n, args):
+    return session.get(f"{base_url}/", timeout=args.timeout)
+
+def _analytics(session, base_url, client_id, n, args):
+    return session.get(f"{base_url}/analytics", params={"kind": "tech", "limit": 20}, timeout=args.timeout)
+
+REQUESTS = {"ideate": _ideate, "status": _status, "health": _health, "analytics": _analytics}
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in REQUESTS:
+            raise argparse.ArgumentTypeError(f"unknown request '{name}' (choose from {', '.join(REQUESTS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+###############################################################################
+# Driver
+###############################################################################
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return round(sorted_values[idx], 1)
+
+def drive(base_url, args):
+    names = list(args.mix)
+    weights = [args.mix[n] for n in names]
+    samples = []        # (name, status_code or None, latency_ms, stages)
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + args.duration
+    remaining = [args.requests] if args.requests else None
+
+    def take_ticket():
+        if remaining is None:
+            return time.perf_counter() < stop_at
+        with lock:
+            if remaining[0] <= 0:
+                return False
+            remaining[0] -= 1
+            return True
+
+    def client(client_id):
+        rng = random.Random(args.seed + client_id)
+        session = requests.Session()
+        n = 0
+        while take_ticket():
+            name = rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                resp = REQUESTS[name](session, base_url, client_id, n, args)
+                status, stages = resp.status_code, parse_server_timing(resp.headers.get("Server-Timing"))
+            except requests.RequestException:
+                status, stages = None, {}
+            with lock:
+                samples.append((name, status, (time.perf_counter() - started) * 1000, stages))
+            n += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(args.concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return samples, time.perf_counter() - started
+
+def summarize(samples, elapsed):
+    endpoints = {}
+    stages = {}
+    status_codes = {}
+    for name, status, latency, stage_ms in samples:
+        ep = endpoints.setdefault(name, {"latencies": [], "errors": 0})
+        ep["latencies"].append(latency)
+        if status is None or status >= 400:
+            ep["errors"] += 1
+        key = str(status) if status is not None else "connection_error"
+        status_codes[key] = status_codes.get(key, 0) + 1
+        for stage, ms in stage_ms.items():
+            stages.setdefault(stage, []).append(ms)
+
+    def latency_stats(values):
+        values = sorted(values)
+        return {
+            "mean_ms": round(sum(values) / len(values), 1) if values else None,
+            "p50_ms": percentile(values, 50),
+            "p95_ms": percentile(values, 95),
+            "p99_ms": percentile(values, 99),
+            "max_ms": round(values[-1], 1) if values else None,
+        }
+
+    total_errors = sum(ep["errors"] for ep in endpoints.values())
+    return {
+        "requests": len(samples),
+        "errors": total_errors,
+        "error_rate": round(total_errors / len(samples), 4) if samples else 0.0,
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "latency": latency_stats([s[2] for s in samples]),
+        "endpoints": {
+            name: {
+                "requests": len(ep["latencies"]),
+                "errors": ep["errors"],
+                "error_rate": round(ep["errors"] / len(ep["latencies"]), 4),
+                "throughput_rps": round(len(ep["latencies"]) / elapsed, 2),
+                **latency_stats(ep["latencies"]),
+            }
+            for name, ep in sorted(endpoints.items())
+        },
+        "stages": {name: latency_stats(values) for name, values in sorted(stages.items())},
+        "status_codes": dict(sorted(status_codes.items())),
+    }
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+###############################################################################
+# CLI
+###############################################################################
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    load = parser.add_argument_group("load")
+    load.add_argument("--concurrency", type=int, default=4)
+    load.add_argument("--duration", type=float, default=30.0, help="seconds to run (ignored with --requests)")
+    load.add_argument("--requests", type=int, help="stop after this many requests instead of a duration")
+    load.add_argument("--mix", type=parse_mix, default=parse_mix("ideate=1,status=1,health=1,analytics=1"),
+                      help="weighted request mix, e.g. ideate=2,status=1 (choices: %s)" % ", ".join(REQUESTS))
+    load.add_argument("--max-repos", type=int, default=2, help="max_repos sent with /ideate")
+    load.add_argument("--unique-ideas", action="store_true", help="never repeat a project idea (defeats caches)")
+    load.add_argument("--no-local-index", action="store_true", help="send use_local_index=false with /ideate")
+    load.add_argument("--timeout", type=float, default=300.0)
+    load.add_argument("--warmup", type=float, default=0.0, help="seconds of unrecorded load before measuring")
+    load.add_argument("--seed", type=int, default=0)
+
+    standins = parser.add_argument_group("stand-ins")
+    standins.add_argument("--base-url", help="drive this running server instead of starting one")
+    standins.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    standins.add_argument("--repos", type=int, default=8, help="number of local repositories")
+    standins.add_argument("--transport", choices=["file", "git-daemon"], default="file")
+    standins.add_argument("--github-latency-ms", type=float, default=0.0)
+    standins.add_argument("--github-error-rate", type=float, default=0.0)
+    standins.add_argument("--llm-latency-ms", type=float, default=0.0)
+    standins.add_argument("--llm-spin-ms", type=float, default=0.0, help="CPU time burnt per fake LLM call")
+    standins.add_argument("--llm-error-rate", type=float, default=0.0)
+    standins.add_argument("--server-env", action="append", default=[], metavar="KEY=VALUE",
+                          help="extra environment for the server (repeatable)")
+
+    parser.add_argument("--label", default="", help="free-form label stored in the report (e.g. a version)")
+    parser.add_argument("--output", help="write the JSON report here (default: stdout)")
+    args = parser.parse_args()
+
+    base_dir = None
+    cleanup = []
+    try:
+        if args.base_url:
+            base_url = args.base_url.rstrip("/")
+        else:
+            base_dir = tempfile.mkdtemp(prefix="loadtest-")
+            names = make_bare_repos(base_dir, args.repos)
+            if args.transport == "git-daemon":
+                daemon = GitDaemon(base_dir)
+                cleanup.append(daemon.stop)
+                urls = [daemon.url(n) for n in names]
+            else:
+                urls = [f"file://{os.path.join(base_dir, 'bare', n)}.git" for n in names]
+            github = FakeGitHub(
+                [{"full_name": f"loadtest/{n}", "html_url": u} for n, u in zip(names, urls)],
+                latency_ms=args.github_latency_ms,
+                error_rate=args.github_error_rate,
+            )
+            cleanup.append(github.stop)
+
+            data_dir = os.path.join(base_dir, "data")
+            os.makedirs(data_dir)
+            server_env = {
+                "FAKE_LLM_LATENCY_MS": str(args.llm_latency_ms),
+                "FAKE_LLM_SPIN_MS": str(args.llm_spin_ms),
+                "FAKE_LLM_ERROR_RATE": str(args.llm_error_rate),
+            }
+            server_env.update(kv.split("=", 1) for kv in args.server_env)
+            proc, base_url = start_api(data_dir, github.url, workers=args.workers, extra_env=server_env)
+            cleanup.append(lambda: (proc.terminate(), proc.wait()))
+
+        if args.warmup:
+            warm = argparse.Namespace(**{**vars(args), "duration": args.warmup, "requests": None})
+            drive(base_url, warm)
+
+        samples, elapsed = drive(base_url, args)
+    finally:
+        for stop in reversed(cleanup):
+            stop()
+        if base_dir:
+            shutil.rmtree(base_dir, ignore_errors=True)
+
+    report = {
+        "label": args.label,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_revision": _git_revision(),
+        "host": {"python": platform.python_version(), "cpu_count": os.cpu_count()},
+        "config": {
+            key: value for key, value in vars(args).items()
+            if key not in ("output", "label")
+        },
+        "duration_s": round(elapsed, 2),
+        **summarize(samples, elapsed),
+    }
+    text = json.dumps(report, indent=2, sort_keys=False)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+        print(f"[INFO] Wrote {args.output}: {report['throughput_rps']} req/s, "
+              f"p95 {report['latency']['p95_ms']} ms, error rate {report['error_rate']}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# loadtest/standins.py
+"""
+Local stand-ins for everything the API talks to, so it can be load tested
+offline: bare git repositories (cloned over file:// or a local git daemon),
+a fake GitHub search API, and the API itself started with the fake LLM
+backend and throwaway data directories.
+"""
+
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_GIT = ["git", "-c", "init.defaultBranch=master", "-c", "user.name=loadtest", "-c", "user.email=loadtest@localhost"]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def make_bare_repos(base_dir, count, files_per_repo=5):
+    """
+    Create `count` small bare repositories under `base_dir/bare` and return
+    their names. Each has a readme.md and a few Python modules.
+    """
+    names = []
+    for i in range(count):
+        name = f"project-{i}"
+        work = os.path.join(base_dir, "work", name)
+        bare = os.path.join(base_dir, "bare", f"{name}.git")
+        os.makedirs(work)
+        with open(os.path.join(work, "readme.md"), "w") as f:
+            f.write(f"# Project {i}\n\nA sample project used for load testing.\n" * 20)
+        for j in range(files_per_repo):
+            with open(os.path.join(work, f"module_{j}.py"), "w") as f:
+                f.write(f"def handler_{j}(request):\n    return {{'project': {i}, 'module': {j}}}\n" * 50)
+        subprocess.run(_GIT + ["init", "-q", work], check=True)
+        subprocess.run(_GIT + ["add", "."], cwd=work, check=True)
+        subprocess.run(_GIT + ["commit", "-q", "-m", "init"], cwd=work, check=True)
+        subprocess.run(["git", "clone", "-q", "--bare", work, bare], check=True)
+        names.append(name)
+    return names
+
+
+class GitDaemon:
+    """`git daemon` exporting `base_dir/bare` read-only on a local port."""
+
+    def __init__(self, base_dir):
+        self.port = free_port()
+        self.proc = subprocess.Popen(
+            ["git", "daemon", "--reuseaddr", "--export-all", f"--port={self.port}",
+             f"--base-path={os.path.join(base_dir, 'bare')}", os.path.join(base_dir, "bare")],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        for _ in range(50):
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=0.2).close()
+                return
+            except OSError:
+                time.sleep(0.1)
+        raise RuntimeError("git daemon did not start")
+
+    def url(self, name):
+        return f"git://127.0.0.1:{self.port}/{name}.git"
+
+    def stop(self):
+        self.proc.terminate()
+        self.proc.wait()
+
+
+class FakeGitHub:
+    """
+    Minimal GitHub search API (`GET /search/repositories`) returning the
+    given repositories, rotated by query so different ideas hit different
+    repos. `latency_ms` and `error_rate` simulate a slow or flaky upstream.
+    """
+
+    def __init__(self, repos, latency_ms=0.0, error_rate=0.0):
+        self.repos = repos      # list of {"full_name": ..., "html_url": ...}
+        self.latency = latency_ms / 1000
+        self.error_rate = error_rate
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if fake.latency:
+                    time.sleep(fake.latency)
+                if fake.error_rate and random.random() < fake.error_rate:
+                    self.send_error(502, "Simulated GitHub failure")
+                    return
+                params = parse_qs(urlparse(self.path).query)
+                per_page = int(params.get("per_page", ["5"])[0])
+                offset = sum(map(ord, params.get("q", [""])[0])) % len(fake.repos)
+                items = [fake.repos[(offset + i) % len(fake.repos)] for i in range(min(per_page, len(fake.repos)))]
+                body = json.dumps({"total_count": len(items), "items": items}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+
+
+def start_api(data_dir, github_url, workers=1, extra_env=None):
+    """
+    Start `uvicorn app:app` with the fake LLM backend and all state under
+    `data_dir`. Returns `(process, base_url)` once the health check answers.
+    """
+    port = free_port()
+    env = dict(
+        os.environ,
+        LLM_BACKEND="fake",
+        GITHUB_API_URL=github_url,
+        DB_PATH=os.path.join(data_dir, "extracted_data.db"),
+        CLONE_DIR=os.path.join(data_dir, "cloned_repos"),
+        CACHE_DIR=os.path.join(data_dir, "cache"),
+        CORPUS_INDEX_PATH=os.path.join(data_dir, "corpus_index.npz"),
+    )
+    env.update(extra_env or {})
+    with open(os.path.join(data_dir, "server.log"), "w") as log:
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app:app", "--app-dir", ROOT,
+             "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+            cwd=data_dir,
+            env=env,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(300):
+        try:
+            if requests.get(base_url + "/", timeout=1).ok:
+                return proc, base_url
+        except requests.RequestException:
+            pass
+        if proc.poll() is not None:
+            break
+        time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError(f"API did not start; see {os.path.join(data_dir, 'server.log')}")
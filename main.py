@@ -3,31 +3,37 @@
 import os
 import streamlit as st
 
+# Settings in the project modules are read at import time, so load .env first
+from utils.helpers import load_env
+load_env()
+
 from extractor.clone_repo import clone_repo
 from extractor.parse_repo import parse_repo
+from extractor.dedup import dedup_repo_data
 from extractor.summarizer import (
     extract_features_and_techstack,
     suggest_new_features_from_features,
 )
 from database.db import (
-    init_db,
     insert_project,
     insert_features,
     insert_tech_stack,
     insert_ideated_features,
 )
+from database.corpus_index import get_index
 from utils.helpers import parse_llm_summary
+from utils.streamlit_db import ensure_db
 from github_search import search_similar_repositories
 
 # ────────────────────────────────
 #  Init
 # ────────────────────────────────
-init_db()
 st.set_page_config(
     page_title="GitHub Extractor & Ideator",
     page_icon="🔍",
     layout="wide",
 )
+ensure_db()
 st.title("🔍 GitHub Extractor  &  💡 Feature Ideator")
 
 tab_single, tab_multi = st.tabs(["Single‑Repo Extractor", "Multi‑Repo Ideation"])
@@ -52,7 +58,11 @@ with tab_single:
             st.stop()
         st.success(f"✅ Cloned to {repo_path}")
 
-        repo_data = parse_repo(repo_path)
+        repo_data, dedup_stats = dedup_repo_data(parse_repo(repo_path))
+        st.caption(
+            f"Skipped {dedup_stats['bytes_saved']:,} bytes (~{dedup_stats['tokens_saved']:,} tokens) "
+            "of duplicate, generated and boilerplate content"
+        )
 
         if repo_data["readme"]:
             st.subheader("README")
@@ -68,6 +78,8 @@ with tab_single:
         project_id = insert_project(repo_url, repo_path)
         insert_features(project_id, features)
         insert_tech_stack(project_id, tech_stack)
+        repo_name = "/".join(repo_url.rstrip("/").split("/")[-2:])
+        get_index().add(repo_url, repo_name, features, tech_stack, repo_data["readme"])
 
         st.success("✅ Data stored in database!")
         col1, col2 = st.columns(2)
@@ -113,12 +125,14 @@ with tab_multi:
                 st.warning("Failed to clone.")
                 continue
 
-            repo_data = parse_repo(local_path)
+            repo_data, dedup_stats = dedup_repo_data(parse_repo(local_path))
+            st.caption(f"Dedup saved ~{dedup_stats['tokens_saved']:,} tokens")
 
             with st.spinner("Extracting features and tech stack…"):
                 summary = extract_features_and_techstack(repo_data)
 
             features, tech_stack = parse_llm_summary(summary)
+            get_index().add(repo["url"], repo["name"], features, tech_stack, repo_data["readme"])
 
             if features:
                 st.markdown("**Extracted Features:**")
@@ -1,62 +1,15 @@
-import streamlit as st
-import sqlite3
-
-DB_NAME = "extracted_data.db"
-
-def get_all_repos():
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT DISTINCT repo_url FROM projects
-        ORDER BY repo_url
-    """)
-    repos = cursor.fetchall()
-    conn.close()
-    return [repo[0] for repo in repos]
-
-def search_data(table, repo_url, keyword):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
+import math
 
-    column_map = {
-        "projects": "repo_url",
-        "features": "feature",
-        "tech_stack": "stack_item"
-    }
-
-    search_column = column_map.get(table)
-    if not search_column:
-        st.error(f"Invalid table selected: {table}")
-        return []
+import streamlit as st
 
-    if table == "projects":
-        query = f"SELECT * FROM projects WHERE repo_url LIKE ?"
-        params = [f"%{keyword}%"]
-    else:
-        if repo_url == "All":
-            query = f"""
-                SELECT * FROM {table}
-                WHERE {search_column} LIKE ?
-            """
-            params = [f"%{keyword}%"]
-        else:
-            query = f"""
-                SELECT * FROM {table}
-                WHERE project_id IN (
-                    SELECT id FROM projects WHERE repo_url = ?
-                ) AND {search_column} LIKE ?
-            """
-            params = [repo_url, f"%{keyword}%"]
+from utils.streamlit_db import TABLE_COLUMNS, count_rows, fetch_page, get_all_repos
 
-    cursor.execute(query, params)
-    results = cursor.fetchall()
-    conn.close()
-    return results
+PAGE_SIZES = [50, 100, 500, 1000]
 
 def main():
     st.title("📊 View Extracted GitHub Project Data")
 
-    table = st.selectbox("Select Table to View", ["projects", "features", "tech_stack"])
+    table = st.selectbox("Select Table to View", list(TABLE_COLUMNS))
 
     all_repos = get_all_repos()
     repo_options = ["All"] + all_repos
@@ -64,27 +17,34 @@ def main():
 
     keyword = st.text_input("Enter keyword to search", "")
 
+    # Keep showing results across reruns (e.g. when changing page) once searched
     if st.button("🔍 Search"):
-        results = search_data(table, selected_repo, keyword)
-
-        if results:
-            st.success(f"Found {len(results)} result(s)")
-            st.write("### Results:")
-
-            if table == "projects":
-                st.dataframe(
-                    [{"ID": r[0], "Repo URL": r[1], "Path": r[2], "Created At": r[3]} for r in results]
-                )
-            elif table == "features":
-                st.dataframe(
-                    [{"ID": r[0], "Project ID": r[1], "Feature": r[2]} for r in results]
-                )
-            elif table == "tech_stack":
-                st.dataframe(
-                    [{"ID": r[0], "Project ID": r[1], "Stack Item": r[2]} for r in results]
-                )
-        else:
-            st.warning("No results found.")
+        st.session_state["view_search"] = (table, selected_repo, keyword)
+
+    search = st.session_state.get("view_search")
+    if not search:
+        return
+    table, selected_repo, keyword = search
+
+    total = count_rows(table, selected_repo, keyword)
+    if not total:
+        st.warning("No results found.")
+        return
+
+    st.success(f"Found {total} result(s)")
+    st.write("### Results:")
+
+    col1, col2 = st.columns(2)
+    page_size = col1.selectbox("Rows per page", PAGE_SIZES, index=1)
+    page_count = max(1, math.ceil(total / page_size))
+    page = col2.number_input("Page", min_value=1, max_value=page_count, value=1, step=1)
+
+    # Only the visible page is loaded, straight into a DataFrame
+    st.dataframe(
+        fetch_page(table, selected_repo, keyword, int(page) - 1, page_size),
+        hide_index=True,
+    )
+    st.caption(f"Page {int(page)} of {page_count}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,39 @@
+import streamlit as st
+
+from database.db import FEATURE, TECH
+from utils.streamlit_db import cooccurring_items, top_items
+
+KINDS = {"Tech Stack": TECH, "Features": FEATURE}
+
+def main():
+    st.title("📈 Tech Stack & Feature Analytics")
+
+    kind_label = st.radio("Count", list(KINDS), horizontal=True)
+    kind = KINDS[kind_label]
+
+    col1, col2 = st.columns(2)
+    keyword = col1.text_input("Only projects whose idea contains keyword", "").strip().lower()
+    limit = col2.slider("Top N", 5, 100, 20)
+
+    try:
+        top = top_items(kind, keyword, limit)
+    except ValueError as e:
+        st.error(str(e))
+        return
+    if top.empty:
+        st.info("No data yet. Run an ideation first.")
+        return
+
+    st.subheader(f"Most common {kind_label.lower()}" + (f" for “{keyword}”" if keyword else ""))
+    st.bar_chart(top, x="item", y="count", horizontal=True)
+
+    st.subheader("Often seen together")
+    selected = st.selectbox("Item", top["item"].tolist())
+    pairs = cooccurring_items(kind, selected, limit)
+    if pairs.empty:
+        st.write("No co-occurring items.")
+    else:
+        st.dataframe(pairs, hide_index=True)
+
+if __name__ == "__main__":
+    main()
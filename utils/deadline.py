@@ -0,0 +1,67 @@
+# utils/deadline.py
+import time
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a stage is started after its deadline has passed."""
+
+
+class Deadline:
+    """
+    A point in time by which work must finish, passed down the pipeline so
+    every stage can bound its own waits (subprocesses, HTTP calls, LLM calls).
+
+    `Deadline(None)` never expires. `budget()` hands a stage a share of the
+    remaining time as a child deadline, so later stages are not starved by an
+    earlier one that runs long. `cancel()` expires a deadline early, together
+    with every child deadline made from it.
+    """
+
+    def __init__(self, seconds=None, parent=None):
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+        self._parent = parent
+        self._cancelled = False
+
+    def cancel(self):
+        """Expire now, e.g. to stop background work; safe to call from any thread."""
+        self._cancelled = True
+
+    def cancelled(self):
+        return self._cancelled or (self._parent is not None and self._parent.cancelled())
+
+    def remaining(self):
+        """Seconds left (never negative), or None without a limit."""
+        if self.cancelled():
+            return 0.0
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.cancelled() or (self.expires_at is not None and time.monotonic() >= self.expires_at)
+
+    def check(self, stage=""):
+        if self.expired():
+            raise DeadlineExceeded(f"Deadline exceeded{' before ' + stage if stage else ''}")
+
+    def timeout(self, cap=None):
+        """
+        A timeout for one blocking call: the remaining time, bounded by `cap`.
+
+        Each module that blocks (clones, archive downloads, GitHub and LLM
+        calls) has its own *_TIMEOUT_SECONDS setting and passes it as `cap`,
+        so the setting is the upper bound for one call and a request
+        deadline can only shorten it, never extend it.
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return cap
+        return remaining if cap is None else min(remaining, cap)
+
+    def budget(self, fraction=1.0, cap=None):
+        """Child deadline covering `fraction` of the remaining time (at most `cap` seconds)."""
+        remaining = self.remaining()
+        if remaining is None:
+            return Deadline(cap, parent=self)
+        seconds = remaining * fraction
+        return Deadline(seconds if cap is None else min(seconds, cap), parent=self)
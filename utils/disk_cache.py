@@ -0,0 +1,71 @@
+# utils/disk_cache.py
+"""
+Small JSON key/value cache on disk, shared by every worker process.
+
+Entries are single files written atomically (temp file + rename), so readers
+never see partial data and need no lock. `get_or_compute` takes a per-key
+file lock so that only one worker computes a missing entry while the others
+wait for and then read its result.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+from utils.file_lock import FileLock
+
+CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+
+
+class DiskCache:
+    def __init__(self, namespace, ttl_seconds, cache_dir=None):
+        self.directory = os.path.join(cache_dir or CACHE_DIR, namespace)
+        self.ttl_seconds = ttl_seconds
+
+    def _path(self, key):
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest + ".json")
+
+    def age(self, key):
+        """Seconds since `key` was stored, or None if it is not cached."""
+        try:
+            return time.time() - os.path.getmtime(self._path(key))
+        except OSError:
+            return None
+
+    def get(self, key, default=None):
+        """Cached value for `key`, or `default` if missing or older than the TTL."""
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                return default
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)["value"]
+        except (OSError, ValueError, KeyError):
+            return default
+
+    def set(self, key, value):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "value": value}, f)
+        os.replace(tmp_path, path)
+
+    def get_or_compute(self, key, compute, timeout=None):
+        """
+        Return the cached value, computing and storing it under a cross-process
+        lock if needed. Waits at most `timeout` seconds for another worker
+        computing the same key, then raises LockTimeout.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+        with FileLock(self._path(key) + ".lock", timeout=timeout):
+            value = self.get(key, missing)
+            if value is missing:
+                value = compute()
+                self.set(key, value)
+        return value
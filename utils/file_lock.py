@@ -0,0 +1,100 @@
+# utils/file_lock.py
+"""
+Inter-process exclusive lock on a lock file, so several uvicorn workers
+(or containers sharing a volume) can coordinate writes to shared files.
+"""
+
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Polling interval while waiting for a lock with a timeout
+_POLL_SECONDS = 0.05
+# Thread locks are striped over a fixed pool, so memory does not grow with the
+# number of distinct paths (every clone and cache key has its own lock file)
+_THREAD_LOCK_STRIPES = 1024
+# Reentrant, so one thread may nest locks on two paths that share a stripe
+_thread_locks = [threading.RLock() for _ in range(_THREAD_LOCK_STRIPES)]
+
+
+class LockTimeout(TimeoutError):
+    """Raised when a FileLock with a `timeout` could not be acquired in time."""
+
+
+class FileLock:
+    """
+    Exclusive lock held for the duration of a `with` block. With
+    `blocking=False`, entering raises BlockingIOError instead of waiting
+    when another thread or process holds the lock. With `timeout`, it
+    waits at most that many seconds and then raises LockTimeout.
+
+    The lock file is created next to the protected resource and never removed,
+    which keeps acquisition race-free. A thread lock, shared by the paths
+    hashing to the same stripe, makes it safe to use from several threads of
+    the same process as well.
+    """
+
+    def __init__(self, path, blocking=True, timeout=None):
+        self.path = os.path.abspath(path)
+        self.blocking = blocking
+        self.timeout = timeout if blocking else None
+        self._thread_lock = _thread_locks[hash(self.path) % _THREAD_LOCK_STRIPES]
+        self._fd = None
+
+    def _lock_file(self, blocking):
+        if fcntl:
+            fcntl.flock(self._fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            try:
+                msvcrt.locking(self._fd, msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+            except OSError as e:
+                raise BlockingIOError(f"{self.path} is locked") from e
+
+    def __enter__(self):
+        if self.timeout is None:
+            if not self._thread_lock.acquire(blocking=self.blocking):
+                raise BlockingIOError(f"{self.path} is locked")
+        else:
+            wait_until = time.monotonic() + max(0.0, self.timeout)
+            if not self._thread_lock.acquire(timeout=max(0.0, self.timeout)):
+                raise LockTimeout(f"{self.path} is still locked after {self.timeout:.1f}s")
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            if self.timeout is None:
+                self._lock_file(self.blocking)
+            else:
+                # flock cannot time out, so poll until the time is up
+                while True:
+                    try:
+                        self._lock_file(False)
+                        break
+                    except BlockingIOError:
+                        remaining = wait_until - time.monotonic()
+                        if remaining <= 0:
+                            raise LockTimeout(f"{self.path} is still locked after {self.timeout:.1f}s")
+                        time.sleep(min(_POLL_SECONDS, remaining))
+        except BaseException:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+            self._thread_lock.release()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if fcntl:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+            self._thread_lock.release()
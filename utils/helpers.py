@@ -2,6 +2,20 @@
 import re
 from typing import List, Tuple
 
+_env_loaded = False
+
+def load_env() -> None:
+    """Load `.env` once, on first call rather than at import time."""
+    global _env_loaded
+    if _env_loaded:
+        return
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass
+    _env_loaded = True
+
 ###############################################################################
 # 1.  Generic helpers you already had
 ###############################################################################
@@ -9,6 +23,10 @@ def chunk_text(text: str, max_length: int = 3_000) -> List[str]:
     """Yield slices of `text` ≤ max_length characters."""
     return [text[i : i + max_length] for i in range(0, len(text), max_length)]
 
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token count (~4 characters per token for English and code)."""
+    return (len(text) + 3) // 4
+
 ###############################################################################
 # 2.  NEW: Clean Groq / LLM output & extract structured data
 ###############################################################################
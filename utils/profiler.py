@@ -0,0 +1,233 @@
+# utils/profiler.py
+"""
+Statistical profiler for individual requests.
+
+A background thread samples thread stacks (`sys._current_frames`) at a
+fixed interval, but only of the profiled request's own work, so concurrent
+requests do not end up in its profile:
+
+* the event loop thread, while one of the request's tasks is running on it
+  (tasks created in the context where `current_profiler` is set, tracked
+  with a task factory installed on the loop)
+* worker threads while they run a function wrapped with `profiled()` in the
+  request's context (repository analysis, chunk batches, search pages)
+
+Samples are aggregated as folded stacks, one line per distinct stack:
+
+    thread;outer_func (file.py:12);inner_func (other.py:40) 17
+
+which flamegraph.pl, speedscope and most flame-graph viewers read directly.
+Threads that are only waiting for work (idle pool workers, the event loop
+in select) are left out.
+"""
+
+import asyncio
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import Counter
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", ".profiles")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "10"))
+# Profiles kept on disk; the oldest are removed beyond this
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "200"))
+
+# Profiler of the request being handled in this context, if it is profiled
+current_profiler = contextvars.ContextVar("current_profiler", default=None)
+
+# (file name, function) of leaf frames that mean "idle, waiting for work"
+_IDLE_LEAVES = {("selectors.py", "select"), ("thread.py", "_worker"), ("queue.py", "get")}
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _is_idle(frame):
+    # The leaf may be a lock wait inside the idle call (e.g. Condition.wait in queue.get)
+    for f in (frame, frame.f_back):
+        if f is not None and (os.path.basename(f.f_code.co_filename), f.f_code.co_name) in _IDLE_LEAVES:
+            return True
+    return False
+
+
+def profiled(fn):
+    """
+    Wrap `fn` to run in another thread (a pool or `asyncio.to_thread`) so its
+    samples count toward the profile of the request submitting it. Returns
+    `fn` unchanged when the current request is not profiled.
+    """
+    profiler = current_profiler.get()
+    if profiler is None:
+        return fn
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        thread_id = threading.get_ident()
+        profiler._enter_thread(thread_id)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profiler._exit_thread(thread_id)
+    return run
+
+
+def _tracking_task_factory(loop, coro, **kwargs):
+    # Record tasks started by a profiled request, so loop samples can be attributed
+    task = asyncio.Task(coro, loop=loop, **kwargs)
+    context = kwargs.get("context")
+    profiler = context.get(current_profiler) if context is not None else current_profiler.get()
+    if profiler is not None:
+        profiler._tasks.add(task)
+    return task
+
+
+class SamplingProfiler:
+    """
+    Samples the threads working for one request every `interval_ms` between
+    `start()` and `stop()`. `start()` must be called from the request's
+    coroutine; it sets `current_profiler` for the tasks it starts.
+    """
+
+    def __init__(self, interval_ms=None):
+        self.interval = (interval_ms or PROFILE_INTERVAL_MS) / 1000
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._threads = Counter()   # worker thread id -> nesting depth of profiled() calls
+        self._tasks = weakref.WeakSet()
+        self._loop = None
+        self._loop_thread = None
+        self._token = None
+
+    def start(self):
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Not in a request: only profiled() worker threads are sampled
+            self._loop = None
+        if self._loop is not None:
+            if self._loop.get_task_factory() is None:
+                self._loop.set_task_factory(_tracking_task_factory)
+            self._loop_thread = threading.get_ident()
+            self._tasks.add(asyncio.current_task())
+            self._token = current_profiler.set(self)
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._token is not None:
+            current_profiler.reset(self._token)
+            self._token = None
+
+    def _enter_thread(self, thread_id):
+        with self._lock:
+            self._threads[thread_id] += 1
+
+    def _exit_thread(self, thread_id):
+        with self._lock:
+            self._threads[thread_id] -= 1
+            if self._threads[thread_id] <= 0:
+                del self._threads[thread_id]
+
+    def _request_threads(self):
+        with self._lock:
+            thread_ids = set(self._threads)
+        if self._loop is not None:
+            # The event loop is shared: sample it only while one of our tasks runs
+            task = asyncio.current_task(self._loop)
+            if task is not None and task in self._tasks:
+                thread_ids.add(self._loop_thread)
+        return thread_ids
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            thread_ids = self._request_threads()
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id not in thread_ids:
+                    continue
+                if _is_idle(frame):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, f"thread-{thread_id}"))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def folded(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def save_profile(profile_id, profiler, meta, profile_dir=PROFILE_DIR):
+    """Write `<id>.folded` and `<id>.json` (metadata) and prune old profiles."""
+    os.makedirs(profile_dir, exist_ok=True)
+    meta = {
+        **meta,
+        "id": profile_id,
+        "samples": profiler.samples,
+        "interval_ms": profiler.interval * 1000,
+        "created_at": time.time(),
+    }
+    for suffix, text in ((".folded", profiler.folded()), (".json", json.dumps(meta))):
+        path = os.path.join(profile_dir, profile_id + suffix)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    _prune(profile_dir)
+    return meta
+
+
+def _prune(profile_dir):
+    metas = sorted(
+        (os.path.join(profile_dir, name) for name in os.listdir(profile_dir) if name.endswith(".json")),
+        # Another worker may prune at the same time
+        key=lambda path: os.path.getmtime(path) if os.path.exists(path) else 0,
+    )
+    for path in metas[:max(0, len(metas) - PROFILE_MAX_FILES)]:
+        for stale in (path, path[: -len(".json")] + ".folded"):
+            try:
+                os.remove(stale)
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles(profile_dir=PROFILE_DIR):
+    """Metadata of stored profiles, newest first."""
+    if not os.path.isdir(profile_dir):
+        return []
+    profiles = []
+    for name in os.listdir(profile_dir):
+        if name.endswith(".json"):
+            try:
+                with open(os.path.join(profile_dir, name), "r", encoding="utf-8") as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+    return sorted(profiles, key=lambda p: p["created_at"], reverse=True)
+
+
+def load_profile(profile_id, profile_dir=PROFILE_DIR):
+    """Folded stacks of one profile, or None."""
+    if os.path.basename(profile_id) != profile_id or profile_id.startswith("."):
+        return None
+    try:
+        with open(os.path.join(profile_dir, profile_id + ".folded"), "r", encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
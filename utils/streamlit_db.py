@@ -0,0 +1,124 @@
+# utils/streamlit_db.py
+"""
+Cached database access for the Streamlit pages.
+
+Streamlit re-runs the whole script on every widget interaction, so anything
+that touches SQLite here is cached:
+
+* the connection and `init_db()` are process-wide resources (`st.cache_resource`);
+* query results are cached for a short TTL (`st.cache_data`) and keyed on
+  SQLite's `PRAGMA data_version`, which changes whenever another connection
+  commits. Any insert made through `database.db` therefore invalidates the
+  cached results on the next rerun without an explicit clear.
+"""
+
+import sqlite3
+import threading
+
+import pandas as pd
+import streamlit as st
+
+from database.db import DB_NAME, get_cooccurring_items, get_top_items, init_db
+
+QUERY_TTL_SECONDS = 300
+
+# Searchable column and display names for each viewable table
+TABLE_COLUMNS = {
+    "projects": ("repo_url", {"id": "ID", "repo_url": "Repo URL", "repo_path": "Path", "created_at": "Created At"}),
+    "features": ("feature", {"id": "ID", "project_id": "Project ID", "feature": "Feature"}),
+    "tech_stack": ("stack_item", {"id": "ID", "project_id": "Project ID", "stack_item": "Stack Item"}),
+}
+
+
+@st.cache_resource
+def ensure_db():
+    """Create the schema once per server process instead of on every rerun."""
+    init_db()
+    return True
+
+
+@st.cache_resource
+def _get_connection():
+    ensure_db()
+    conn = sqlite3.connect(DB_NAME, check_same_thread=False)
+    # Sessions run in separate threads; the shared connection is guarded by this lock
+    return conn, threading.Lock()
+
+
+def data_version() -> int:
+    """Changes every time another connection commits to the database."""
+    conn, lock = _get_connection()
+    with lock:
+        return conn.execute("PRAGMA data_version").fetchone()[0]
+
+
+def _read_sql(query, params=()):
+    conn, lock = _get_connection()
+    with lock:
+        return pd.read_sql_query(query, conn, params=params)
+
+
+@st.cache_data(ttl=QUERY_TTL_SECONDS, show_spinner=False)
+def _get_all_repos(version):
+    return _read_sql("SELECT DISTINCT repo_url FROM projects ORDER BY repo_url")["repo_url"].tolist()
+
+
+def get_all_repos():
+    return _get_all_repos(data_version())
+
+
+def _where_clause(table, repo_url, keyword):
+    search_column, _ = TABLE_COLUMNS[table]
+    if table == "projects" or repo_url == "All":
+        return f"WHERE {search_column} LIKE ?", [f"%{keyword}%"]
+    return (
+        f"WHERE project_id IN (SELECT id FROM projects WHERE repo_url = ?) AND {search_column} LIKE ?",
+        [repo_url, f"%{keyword}%"],
+    )
+
+
+@st.cache_data(ttl=QUERY_TTL_SECONDS, show_spinner=False)
+def _count_rows(table, repo_url, keyword, version):
+    where, params = _where_clause(table, repo_url, keyword)
+    return int(_read_sql(f"SELECT COUNT(*) AS n FROM {table} {where}", params)["n"].iloc[0])
+
+
+def count_rows(table, repo_url, keyword):
+    return _count_rows(table, repo_url, keyword, data_version())
+
+
+@st.cache_data(ttl=QUERY_TTL_SECONDS, show_spinner=False)
+def _fetch_page(table, repo_url, keyword, page, page_size, version):
+    _, display_names = TABLE_COLUMNS[table]
+    where, params = _where_clause(table, repo_url, keyword)
+    query = (
+        f"SELECT {', '.join(display_names)} FROM {table} {where} "
+        "ORDER BY id LIMIT ? OFFSET ?"
+    )
+    df = _read_sql(query, params + [page_size, page * page_size])
+    return df.rename(columns=display_names)
+
+
+def fetch_page(table, repo_url, keyword, page, page_size):
+    """One page of matching rows as a DataFrame; only that page is read from SQLite."""
+    if table not in TABLE_COLUMNS:
+        raise ValueError(f"Invalid table: {table}")
+    return _fetch_page(table, repo_url, keyword, page, page_size, data_version())
+
+
+@st.cache_data(ttl=QUERY_TTL_SECONDS, show_spinner=False)
+def _top_items(kind, keyword, limit, version):
+    return pd.DataFrame(get_top_items(kind, keyword or None, limit), columns=["item", "count"])
+
+
+def top_items(kind, keyword=None, limit=20):
+    return _top_items(kind, keyword, limit, data_version())
+
+
+@st.cache_data(ttl=QUERY_TTL_SECONDS, show_spinner=False)
+def _cooccurring_items(kind, item, limit, version):
+    return pd.DataFrame(get_cooccurring_items(kind, item, limit), columns=["item", "count"])
+
+
+def cooccurring_items(kind, item, limit=20):
+    return _cooccurring_items(kind, item, limit, data_version())
@@ -0,0 +1,47 @@
+# utils/timing.py
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StageTimer:
+    """
+    Accumulates wall time per pipeline stage (thread-safe, so repositories
+    processed in parallel add up) and renders it as a `Server-Timing` header.
+    """
+
+    def __init__(self):
+        self._durations = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def add(self, name, seconds):
+        with self._lock:
+            self._durations[name] = self._durations.get(name, 0.0) + seconds
+
+    def as_dict(self):
+        """Milliseconds per stage."""
+        with self._lock:
+            return {name: round(seconds * 1000, 1) for name, seconds in self._durations.items()}
+
+    def server_timing_header(self):
+        return ", ".join(f"{name};dur={ms}" for name, ms in self.as_dict().items())
+
+
+def parse_server_timing(header):
+    """Inverse of `StageTimer.server_timing_header`: {stage: milliseconds}."""
+    stages = {}
+    for entry in (header or "").split(","):
+        name, _, params = entry.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "dur" and name:
+                stages[name] = float(value)
+    return stages
@@ -0,0 +1,278 @@
+# warmup.py
+"""
+Background warm-up of the search cache and the local corpus index.
+
+Project ideas cluster around a few dozen popular ones. The scheduler learns
+them from the /ideate request log and the stored [MultiRepo:...] projects
+(`get_frequent_ideas`). While the API is idle it runs the GitHub search and
+the repository analysis for them ahead of time, so an interactive /ideate
+for a popular idea finds cached search results and fresh analyses in the
+local index instead of cloning and summarizing from scratch.
+
+Each cycle is bounded by an LLM prompt-token budget and a CPU-time budget
+and stops as soon as a request comes in, also in the middle of analysing a
+repository (at its next chunk batch or LLM call). Entries are refreshed once they
+have used up most of their TTL, so they do not expire between cycles.
+Only one worker process warms at a time.
+
+    python -m warmup --once        # one cycle now, ignoring idleness
+    python -m warmup --list        # show the ideas that would be warmed
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from utils.helpers import load_env
+# Loaded before the project modules read their settings, for `python -m warmup`
+load_env()
+
+from database.corpus_index import get_index
+from database.db import get_frequent_ideas, prune_idea_requests
+from extractor.summarizer import llm_usage
+from github_search import SEARCH_CACHE_TTL_SECONDS, search_cache_age, search_similar_repositories
+from utils.deadline import Deadline, DeadlineExceeded
+from utils.disk_cache import CACHE_DIR
+from utils.file_lock import FileLock
+
+logger = logging.getLogger(__name__)
+
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "0") == "1"
+WARMUP_INTERVAL_SECONDS = float(os.getenv("WARMUP_INTERVAL_SECONDS", "300"))
+# The API counts as idle after this long without a request ...
+WARMUP_IDLE_SECONDS = float(os.getenv("WARMUP_IDLE_SECONDS", "60"))
+# ... and while the 1-minute load average per CPU is below this
+WARMUP_MAX_LOAD = float(os.getenv("WARMUP_MAX_LOAD", "0.5"))
+# Budgets per cycle: estimated LLM prompt tokens and CPU seconds (this process and its git children)
+WARMUP_TOKEN_BUDGET = int(os.getenv("WARMUP_TOKEN_BUDGET", "200000"))
+WARMUP_CPU_SECONDS = float(os.getenv("WARMUP_CPU_SECONDS", "60"))
+# Which ideas are warmed: the most frequent ones asked for at least twice recently.
+# Request log rows older than the window are pruned.
+WARMUP_TOP_IDEAS = int(os.getenv("WARMUP_TOP_IDEAS", "20"))
+WARMUP_WINDOW_DAYS = 30
+WARMUP_MIN_COUNT = 2
+# Repositories per idea; the /ideate default, so warm searches share its cache key
+WARMUP_MAX_REPOS = 3
+WARMUP_REPO_DEADLINE_SECONDS = 120
+# Refresh cached searches and analyses once this share of their TTL has passed
+REFRESH_AT = 0.8
+
+class ActivityTracker:
+    """In-flight request count and time of the last request in this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.last_request = time.monotonic()
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """Call `callback()` whenever a request begins, until removed."""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self._lock:
+            self._listeners.remove(callback)
+
+    def begin(self):
+        with self._lock:
+            self.in_flight += 1
+            self.last_request = time.monotonic()
+            listeners = list(self._listeners)
+        for callback in listeners:
+            callback()
+
+    def end(self):
+        with self._lock:
+            self.in_flight -= 1
+            self.last_request = time.monotonic()
+
+    def idle_for(self):
+        """Seconds without any request in flight (0 while one is)."""
+        with self._lock:
+            return 0.0 if self.in_flight else time.monotonic() - self.last_request
+
+activity = ActivityTracker()
+
+def prune_request_log():
+    """Drop /ideate request log rows that have left the window ideas are counted over."""
+    since = datetime.now() - timedelta(days=WARMUP_WINDOW_DAYS)
+    prune_idea_requests(since)
+    return since
+
+class _Budget:
+    def __init__(self, tokens, cpu_seconds):
+        self.tokens = tokens
+        self.cpu_seconds = cpu_seconds
+        self._tokens_at_start = llm_usage()["prompt_tokens"]
+        self._cpu_at_start = self._cpu()
+
+    @staticmethod
+    def _cpu():
+        t = os.times()
+        return t.user + t.system + t.children_user + t.children_system
+
+    def used(self):
+        return {
+            "prompt_tokens": llm_usage()["prompt_tokens"] - self._tokens_at_start,
+            "cpu_seconds": round(self._cpu() - self._cpu_at_start, 2),
+        }
+
+    def exhausted(self):
+        used = self.used()
+        return used["prompt_tokens"] >= self.tokens or used["cpu_seconds"] >= self.cpu_seconds
+
+class WarmupScheduler:
+    """
+    Runs warm-up cycles in a background thread while the API is idle.
+
+    `analyze(repo_info, deadline, refresh)` analyses one repository and adds
+    it to the local index (app._process_repository); `analysis_ttl_seconds`
+    is how long /ideate reuses a stored analysis.
+    """
+
+    def __init__(self, analyze, analysis_ttl_seconds, tracker=activity):
+        self.analyze = analyze
+        self.analysis_ttl_seconds = analysis_ttl_seconds
+        self.tracker = tracker
+        self.lock_path = os.path.join(CACHE_DIR, "warmup.lock")
+        self.last_cycle = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._deadline = None   # of the analysis in progress
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        deadline = self._deadline
+        if deadline is not None:
+            deadline.cancel()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def is_idle(self):
+        if self.tracker.idle_for() < WARMUP_IDLE_SECONDS:
+            return False
+        if hasattr(os, "getloadavg"):
+            return os.getloadavg()[0] / (os.cpu_count() or 1) < WARMUP_MAX_LOAD
+        return True
+
+    def _run(self):
+        while not self._stop.wait(WARMUP_INTERVAL_SECONDS):
+            if not self.is_idle():
+                continue
+            try:
+                # Only one worker process warms; the others skip this round
+                with FileLock(self.lock_path, blocking=False):
+                    self.run_cycle()
+            except BlockingIOError:
+                continue
+            except Exception as e:
+                logger.error(f"Warm-up cycle failed: {str(e)}")
+
+    def _interrupted(self, check_idle):
+        # The load average includes our own work, so mid-cycle only new requests interrupt
+        return self._stop.is_set() or (check_idle and self.tracker.idle_for() < WARMUP_IDLE_SECONDS)
+
+    def run_cycle(self, check_idle=True):
+        """Warm the most frequent ideas until done, out of budget or interrupted. Returns a summary."""
+        started = time.time()
+        budget = _Budget(WARMUP_TOKEN_BUDGET, WARMUP_CPU_SECONDS)
+        since = prune_request_log()
+        ideas = get_frequent_ideas(since, WARMUP_TOP_IDEAS, WARMUP_MIN_COUNT)
+        summary = {"ideas": len(ideas), "ideas_warmed": 0, "searches": 0, "analysed": 0, "fresh": 0, "stopped": None}
+
+        for entry in ideas:
+            if budget.exhausted():
+                summary["stopped"] = "budget"
+                break
+            if self._interrupted(check_idle):
+                summary["stopped"] = "busy"
+                break
+            self._warm_idea(entry["idea"], budget, summary, check_idle)
+            summary["ideas_warmed"] += 1
+
+        summary.update(budget.used(), started_at=started, elapsed_s=round(time.time() - started, 2))
+        self.last_cycle = summary
+        logger.info(f"Warm-up cycle: {summary}")
+        return summary
+
+    def _warm_idea(self, idea, budget, summary, check_idle):
+        age = search_cache_age(idea, WARMUP_MAX_REPOS)
+        refresh_search = age is None or age > SEARCH_CACHE_TTL_SECONDS * REFRESH_AT
+        try:
+            repos = search_similar_repositories(idea, WARMUP_MAX_REPOS, refresh=refresh_search)
+        except Exception as e:
+            logger.warning(f"Warm-up search failed for '{idea}': {str(e)}")
+            return
+        summary["searches"] += refresh_search
+
+        for repo_info in repos:
+            if get_index().get(repo_info["url"], max_age_seconds=self.analysis_ttl_seconds * REFRESH_AT):
+                summary["fresh"] += 1
+                continue
+            if budget.exhausted() or self._interrupted(check_idle):
+                return
+            try:
+                if self._analyze(repo_info, check_idle):
+                    summary["analysed"] += 1
+            except DeadlineExceeded as e:
+                if self._interrupted(check_idle):
+                    logger.info(f"Warm-up analysis of {repo_info['name']} interrupted")
+                    return
+                logger.warning(f"Warm-up analysis timed out for {repo_info['name']}: {str(e)}")
+            except Exception as e:
+                logger.warning(f"Warm-up analysis failed for {repo_info['name']}: {str(e)}")
+
+    def _analyze(self, repo_info, check_idle):
+        """
+        Analyse one repository under a deadline that is cancelled as soon as a
+        request comes in (with `check_idle`) or the scheduler stops, so the
+        extraction stops at its next chunk batch or LLM call.
+        """
+        deadline = Deadline(WARMUP_REPO_DEADLINE_SECONDS)
+        self._deadline = deadline
+        if check_idle:
+            self.tracker.add_listener(deadline.cancel)
+        try:
+            # A request that came in before the listener was added
+            if self._interrupted(check_idle):
+                deadline.cancel()
+            return self.analyze(repo_info, deadline, True)
+        finally:
+            self._deadline = None
+            if check_idle:
+                self.tracker.remove_listener(deadline.cancel)
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Warm the search cache and local index for frequent ideas")
+    parser.add_argument("--once", action="store_true", help="run one warm-up cycle now")
+    parser.add_argument("--list", action="store_true", help="only list the ideas that would be warmed")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    from database.db import init_db
+    init_db()
+    if args.list or not args.once:
+        since = datetime.now() - timedelta(days=WARMUP_WINDOW_DAYS)
+        for entry in get_frequent_ideas(since, WARMUP_TOP_IDEAS, WARMUP_MIN_COUNT):
+            print(f"{entry['count']:6}  {entry['idea']}")
+    if args.once:
+        from app import ANALYSIS_TTL_SECONDS, _process_repository
+        from utils.timing import StageTimer
+
+        scheduler = WarmupScheduler(
+            lambda repo_info, deadline, refresh: _process_repository(repo_info, StageTimer(), deadline, refresh),
+            ANALYSIS_TTL_SECONDS,
+        )
+        print(json.dumps(scheduler.run_cycle(check_idle=False), indent=2))